@@ -1,41 +1,173 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Annotated
+from typing import Dict, Annotated, List, Optional, Union
+import asyncio
 import logging
+import math
+import os
+import threading
+import time
 from pathlib import Path
 from contextlib import asynccontextmanager
 import polars as pl
 
-from models import AddressCoverage, OperatorCoverage
-from services.coverage_calculator import compute_coverage_for_point
-from services.coverage_loader import load_coverage_measure_from_csv
-from services.geocoding import geocode_address
+from models import (
+    AddressCoverage, OperatorCoverage, CoordinateInput,
+    NearestAntenna, NearestAntennasRequest, Antenna, AntennaTile,
+    RouteRequest, RouteCoverage, AreaRequest, AreaCoverage, DatasetUpdate,
+    RadiusProfile, CoordinateColumns, CoverageColumns
+)
+from services.coverage_loader import ingest_coverage_measure, compute_dataset_version
+from services.coverage_calculator import TECHNOLOGIES
+from services.antenna_tiles import AntennaTiles, TILE_KEY_ZOOM
+from services.geocoding import (
+    geocode_address, convert_gps_to_lambert93_batch, fetch_commune_contour, GeocodingError
+)
+from services.spatial_index import SpatialIndex, nearest_to_dict
+from services.route_coverage import compute_route_coverage, RouteError
+from services.area_coverage import compute_area_coverage, AreaError
+from services.radius_presets import RadiusPresets, RadiusPresetError, MAX_RADIUS
+from services.startup import StartupProgress, import_deferred_modules, warm_up_projection, warm_up_queries
+from services.coverage_delta import load_coverage_delta_from_csv, apply_coverage_delta, DeltaError
+from services.sharding import ShardedCoverage, LocalCoverage, DEFAULT_SHARD_SIZE
+from services.dataset import CoverageDataset
+from services.micro_batching import CoverageBatcher, DEFAULT_BATCH_WINDOW_MS, DEFAULT_MAX_BATCH_POINTS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    logger.info("🚀 Loading coverage data...")
+# Largest number of antennas listed by /antennas
+MAX_BBOX_ANTENNAS = 50000
+
+# Operators of the dataset and their field in the coverage responses
+RESPONSE_OPERATORS = {'Orange': 'orange', 'SFR': 'SFR', 'Bouygues': 'bouygues', 'Free': 'Free'}
+
+# Tiles may be stored but are revalidated on every use through their ETag,
+# which changes with the dataset: a delta is visible at once
+TILE_CACHE_CONTROL = "public, no-cache"
+
+# Named radius profiles shared by every request
+radius_presets = RadiusPresets()
+
+# Deltas are applied one at a time; queries keep reading the previous dataset meanwhile
+dataset_lock = threading.Lock()
+
+# "background" accepts requests at once and loads the data behind readiness,
+# "blocking" loads everything before accepting requests
+STARTUP_MODE = os.environ.get("COVERAGE_STARTUP_MODE", "background")
+
+# With shard workers, /coverage is answered by local worker processes each
+# holding a geographic part of the dataset; 0 keeps everything in this process
+SHARD_WORKERS = int(os.environ.get("COVERAGE_SHARD_WORKERS", "0"))
+SHARD_SIZE = float(os.environ.get("COVERAGE_SHARD_SIZE", DEFAULT_SHARD_SIZE))
+
+# Points of concurrent /coverage requests are evaluated together; a window of 0 disables batching
+coverage_batcher = CoverageBatcher(
+    float(os.environ.get("COVERAGE_BATCH_WINDOW_MS", DEFAULT_BATCH_WINDOW_MS)),
+    int(os.environ.get("COVERAGE_BATCH_MAX_POINTS", DEFAULT_MAX_BATCH_POINTS)),
+)
+
+def find_coverage_sources() -> List[Path]:
+    """
+    Coverage CSV files or directories: COVERAGE_DATA_PATH (several entries
+    separated by the OS path separator), else the bundled CSV
+    """
+    data_path = os.environ.get("COVERAGE_DATA_PATH")
+    if data_path:
+        return [Path(entry) for entry in data_path.split(os.pathsep) if entry]
     csv_path = Path("data/coverage_measure.csv")
     if not csv_path.exists():
         csv_path = Path("coverage_measure.csv")
-    if csv_path.exists():
-        try:
-            coverage_df = load_coverage_measure_from_csv(csv_path)
-            logger.info(f"✅ Loaded {len(coverage_df)} towers from {csv_path}")
-            operators = coverage_df['operator'].unique().to_list()
-            logger.info(f"📊 Operators found: {operators}")
-            app.state.coverage_df = coverage_df
-        except Exception as e:
-            logger.error(f"❌ Error loading CSV: {e}")
-            app.state.coverage_df = None
+    return [csv_path]
+
+def log_ingest_report(report: Dict):
+    """Log the rows rejected while loading the coverage files"""
+    logger.info(
+        f"📥 Read {report['rows']} rows from {len(report['files'])} file(s): "
+        f"{report['rejected']} rejected, {report['duplicates']} duplicates merged"
+    )
+    if report['rejected']:
+        logger.warning(f"⚠️ Rejected rows by reason: {report['reasons']}")
+        for sample in report['samples']:
+            logger.warning(f"⚠️ {sample['source']}:{sample['line']}: {sample['reason']}")
+
+async def load_coverage_data(app: FastAPI, sources, startup: StartupProgress):
+    """
+    Load the coverage data, build its indexes and warm up the query paths.
+
+    Independent phases run concurrently in worker threads: the CSV files
+    are read and validated while deferred modules are imported and the projection is built, then
+    the spatial index and the antenna tiles are built together.
+    """
+    def read_csv():
+        coverage_df, report = ingest_coverage_measure(sources)
+        log_ingest_report(report)
+        return coverage_df
+
+    try:
+        coverage_df, _, _ = await asyncio.gather(
+            asyncio.to_thread(startup.run, "load_csv", read_csv),
+            asyncio.to_thread(startup.run, "imports", import_deferred_modules),
+            asyncio.to_thread(startup.run, "projection", warm_up_projection),
+        )
+        logger.info(f"✅ Loaded {len(coverage_df)} towers")
+        operators = coverage_df['operator'].unique().to_list()
+        logger.info(f"📊 Operators found: {operators}")
+        dataset_version = compute_dataset_version(coverage_df)
+        logger.info(f"🏷️ Dataset version: {dataset_version}")
+
+        coverage_index, antenna_tiles = await asyncio.gather(
+            asyncio.to_thread(startup.run, "spatial_index", SpatialIndex, coverage_df),
+            asyncio.to_thread(startup.run, "antenna_tiles", AntennaTiles, coverage_df, dataset_version),
+        )
+        app.state.dataset = CoverageDataset(coverage_df, coverage_index, antenna_tiles, dataset_version)
+
+        await asyncio.to_thread(startup.run, "warmup", warm_up_queries, coverage_index, antenna_tiles)
+    except Exception as e:
+        logger.error(f"❌ Error loading coverage data: {e}")
+        startup.fail(f"load_coverage_data: {e}")
+    startup.mark_ready()
+    logger.info(f"⏱️ Startup phases: {startup.report()}")
+
+async def start_coverage_shards(app: FastAPI, sources, startup: StartupProgress, workers: int):
+    """
+    Start the shard worker processes answering /coverage.
+    The dataset is not loaded in this process, so only /coverage is served.
+    """
+    def start_shards():
+        return ShardedCoverage(sources, workers, SHARD_SIZE).start()
+
+    try:
+        app.state.coverage_shards = await asyncio.to_thread(startup.run, "shards", start_shards)
+        logger.info(f"🧩 Started {len(app.state.coverage_shards.sizes)} shard workers: {app.state.coverage_shards.sizes} antennas")
+    except Exception as e:
+        logger.error(f"❌ Error starting coverage shards: {e}")
+        startup.fail(f"start_coverage_shards: {e}")
+    startup.mark_ready()
+    logger.info(f"⏱️ Startup phases: {startup.report()}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"🚀 Loading coverage data ({STARTUP_MODE} startup)...")
+    app.state.startup = StartupProgress()
+    app.state.dataset = None
+    app.state.coverage_shards = None
+
+    if SHARD_WORKERS > 0:
+        loading = asyncio.create_task(
+            start_coverage_shards(app, find_coverage_sources(), app.state.startup, SHARD_WORKERS)
+        )
     else:
-        logger.error(f"❌ CSV file not found at {csv_path.absolute()}")
-        app.state.coverage_df = None
+        loading = asyncio.create_task(load_coverage_data(app, find_coverage_sources(), app.state.startup))
+    if STARTUP_MODE == "blocking":
+        await loading
     yield
-    # No teardown needed
+    if not loading.done():
+        loading.cancel()
+    if app.state.coverage_shards is not None:
+        app.state.coverage_shards.close()
 
 app = FastAPI(
     title="Network Coverage API",
@@ -53,45 +185,113 @@ app.add_middleware(
 )
 
 # Dependency injection
-def get_coverage_data() -> pl.DataFrame:
-    """Dependency injection for coverage data"""
-    coverage_df = getattr(app.state, "coverage_df", None)
-    if coverage_df is None:
+def check_startup():
+    """Answer 503 rather than 500 while the data is still loading"""
+    startup = getattr(app.state, "startup", None)
+    if startup is not None and startup.loading:
+        raise HTTPException(status_code=503, detail="Coverage data is loading", headers={"Retry-After": "1"})
+
+def get_dataset() -> CoverageDataset:
+    """
+    Dependency injection for the current dataset snapshot.
+    Evaluated once per request, so every dependency below reads the same snapshot.
+    """
+    dataset = getattr(app.state, "dataset", None)
+    if dataset is None:
+        check_startup()
         logger.error("Coverage data not loaded")
         raise HTTPException(status_code=500, detail="Coverage data not available")
-    return coverage_df
+    return dataset
+
+def get_coverage_data(dataset: Annotated[CoverageDataset, Depends(get_dataset)]) -> pl.DataFrame:
+    """Dependency injection for coverage data"""
+    return dataset.df
+
+def get_coverage_index(dataset: Annotated[CoverageDataset, Depends(get_dataset)]) -> SpatialIndex:
+    """Dependency injection for the antenna spatial index"""
+    return dataset.index
+
+def get_antenna_tiles(dataset: Annotated[CoverageDataset, Depends(get_dataset)]) -> AntennaTiles:
+    """Dependency injection for the tiled antenna table"""
+    return dataset.tiles
+
+def get_coverage_source() -> Union[LocalCoverage, ShardedCoverage]:
+    """Dependency injection for /coverage: the shard workers if started, else the local dataset"""
+    coverage_shards = getattr(app.state, "coverage_shards", None)
+    if coverage_shards is not None:
+        return coverage_shards
+    return get_dataset().coverage
+
+def get_radius_by_tech(
+    preset: Optional[str] = None,
+    radius_2g: Annotated[Optional[float], Query(gt=0, le=MAX_RADIUS, allow_inf_nan=False)] = None,
+    radius_3g: Annotated[Optional[float], Query(gt=0, le=MAX_RADIUS, allow_inf_nan=False)] = None,
+    radius_4g: Annotated[Optional[float], Query(gt=0, le=MAX_RADIUS, allow_inf_nan=False)] = None
+) -> Dict[str, float]:
+    """Dependency injection for the request radii: a named preset, optionally overridden per technology"""
+    try:
+        return radius_presets.resolve(preset, {"2G": radius_2g, "3G": radius_3g, "4G": radius_4g})
+    except RadiusPresetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/")
 def read_root():
     """Root endpoint"""
-    coverage_df = getattr(app.state, "coverage_df", None)
+    dataset = getattr(app.state, "dataset", None)
     return {
         "message": "Network Coverage API is running!",
-        "coverage_data_loaded": coverage_df is not None,
-        "towers_count": len(coverage_df) if coverage_df is not None else 0
+        "coverage_data_loaded": dataset is not None,
+        "towers_count": len(dataset.df) if dataset is not None else 0
     }
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
-    coverage_df = getattr(app.state, "coverage_df", None)
+    """Health check endpoint, healthy once startup is complete"""
+    dataset = getattr(app.state, "dataset", None)
+    coverage_shards = getattr(app.state, "coverage_shards", None)
+    startup = getattr(app.state, "startup", None)
+    loaded = dataset is not None or coverage_shards is not None
+    ready = loaded and (startup is None or startup.ready)
     return {
-        "status": "healthy" if coverage_df is not None else "unhealthy",
-        "coverage_data_loaded": coverage_df is not None,
-        "records_count": len(coverage_df) if coverage_df is not None else 0
+        "status": "healthy" if ready else "unhealthy",
+        "coverage_data_loaded": dataset is not None,
+        "records_count": len(dataset.df) if dataset is not None else 0
     }
 
+@app.get("/health/live")
+def liveness_check():
+    """Liveness probe: the process answers requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness_check(response: Response):
+    """
+    Readiness probe: 200 once the data is loaded, indexed and warmed up,
+    503 before. Reports the duration of each startup phase.
+    """
+    startup = getattr(app.state, "startup", None)
+    if startup is None:
+        report = {"ready": False, "error": "Startup has not run", "elapsed_ms": 0.0, "phases": {}}
+    else:
+        report = startup.report()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
+
 @app.post("/coverage", response_model=Dict[str, AddressCoverage])
 async def check_coverage(
-    addresses: Dict[str, str],
-    coverage_df: Annotated[pl.DataFrame, Depends(get_coverage_data)]
-) -> Dict[str, AddressCoverage]:
+    addresses: Dict[str, Union[str, CoordinateInput]],
+    coverage: Annotated[Union[LocalCoverage, ShardedCoverage], Depends(get_coverage_source)],
+    radius_by_tech: Annotated[Dict[str, float], Depends(get_radius_by_tech)]
+) -> JSONResponse:
     """
     Check network coverage for multiple addresses.
     
     Args:
-        addresses: Dict with id as key and address string as value
-        coverage_df: The coverage data as a Polars DataFrame
+        addresses: Dict with id as key and, as value, either an address string
+            or pre-geocoded coordinates ({"lon", "lat"} or {"x", "y"})
+        coverage: The local dataset or the shard workers answering coverage queries
+        radius_by_tech: Radius per technology, from the preset and radius_* query parameters
 
     Returns:
         Dict with id as key and coverage information as value
@@ -101,8 +301,18 @@ async def check_coverage(
         raise HTTPException(status_code=400, detail="No addresses provided")
     
     results = {}
-    
+
+    # Pre-geocoded coordinates skip the geocoder
+    coordinates = {
+        address_id: value for address_id, value in addresses.items()
+        if isinstance(value, CoordinateInput)
+    }
+    points = [resolve_coordinates(coordinates)]
+
     for address_id, address in addresses.items():
+        if address_id in coordinates:
+            continue
+
         logger.info(f"📍 Processing {address_id}: {address}")
         
         try:
@@ -112,27 +322,368 @@ async def check_coverage(
             if geocode_result is None:
                 logger.warning(f"❌ Cannot geocode: {address}")
                 # Assign default AddressCoverage (no coverage) for this address_id
-                results[address_id] = convert_coverage_to_model({})
+                results[address_id] = coverage_to_response({})
                 continue
             
             logger.info(f"📍 Found coordinates: Lambert93({geocode_result.x_lambert93:.2f}, {geocode_result.y_lambert93:.2f})")
-            
-            # Step 2: Calculate coverage
-            coverage_dict = compute_coverage_for_point(
-                geocode_result.x_lambert93,
-                geocode_result.y_lambert93,
-                coverage_df
-            )
-            
-            # Step 3: Convert to Pydantic models
-            results[address_id] = convert_coverage_to_model(coverage_dict)
+            points.append(pl.DataFrame(
+                {"id": [address_id], "x": [geocode_result.x_lambert93], "y": [geocode_result.y_lambert93]},
+                schema={"id": pl.Utf8, "x": pl.Float64, "y": pl.Float64}
+            ))
             
         except Exception as e:
             logger.error(f"Error processing {address_id}: {str(e)}")
             # Assign default AddressCoverage (no coverage) for this address_id
-            results[address_id] = convert_coverage_to_model({})
+            results[address_id] = coverage_to_response({})
+
+    # Step 2: Calculate the coverage of every located point, batched with concurrent requests
+    coverage_by_id = await coverage_batcher.evaluate(coverage, pl.concat(points), radius_by_tech)
+    for address_id, coverage_dict in coverage_by_id.items():
+        results[address_id] = coverage_to_response(coverage_dict)
+
+    # Keep the response in the request order. The dicts are built in the
+    # AddressCoverage shape and returned as is: validating one model per id
+    # against response_model took as long as the coverage itself.
+    return JSONResponse({address_id: results[address_id] for address_id in addresses})
+
+
+@app.post("/coverage/points", response_model=CoverageColumns)
+async def check_points_coverage(
+    points: CoordinateColumns,
+    coverage: Annotated[Union[LocalCoverage, ShardedCoverage], Depends(get_coverage_source)],
+    radius_by_tech: Annotated[Dict[str, float], Depends(get_radius_by_tech)]
+) -> CoverageColumns:
+    """
+    Check network coverage for many pre-geocoded points sent as columns.
+
+    Columns are validated and answered without a per-point object, which
+    makes this the fastest way to evaluate large batches of points.
+
+    Args:
+        points: Columns lon/lat (WGS84) or x/y (Lambert93) of equal length
+        coverage: The local dataset or the shard workers answering coverage queries
+        radius_by_tech: Radius per technology, from the preset and radius_* query parameters
+
+    Returns:
+        Number of points and, per operator and technology, one boolean per
+        point in the request order
+    """
+    if points.x is not None:
+        xs, ys = points.x, points.y
+    else:
+        xs, ys = convert_gps_to_lambert93_batch(points.lon, points.lat)
+        if not all(math.isfinite(x) and math.isfinite(y) for x, y in zip(xs, ys)):
+            raise HTTPException(status_code=422, detail="Coordinates outside the Lambert93 projection")
+
+    count = len(xs)
+    frame = pl.DataFrame({"x": xs, "y": ys}, schema={"x": pl.Float64, "y": pl.Float64}).with_row_index('id')
+    hits = await asyncio.to_thread(coverage.coverage_hits, frame, radius_by_tech) if count else None
+
+    covered = {}
+    if hits is not None and hits.height:
+        hits = hits.with_columns(pl.col('id').cast(pl.Int64))
+        for (operator, tech), group in hits.partition_by('operator', 'tech', as_dict=True).items():
+            covered[operator, tech] = group['id']
+    ids = pl.int_range(0, count, eager=True)
+    return CoverageColumns(count=count, coverage={
+        field: {
+            tech: ids.is_in(covered[operator, tech]).to_list() if (operator, tech) in covered else [False] * count
+            for tech in TECHNOLOGIES
+        }
+        for operator, field in RESPONSE_OPERATORS.items()
+    })
+
+
+@app.post("/coverage/route", response_model=RouteCoverage)
+def check_route_coverage(
+    route: RouteRequest,
+    coverage_df: Annotated[pl.DataFrame, Depends(get_coverage_data)],
+    coverage_index: Annotated[SpatialIndex, Depends(get_coverage_index)],
+    radius_by_tech: Annotated[Dict[str, float], Depends(get_radius_by_tech)]
+) -> RouteCoverage:
+    """
+    Check network coverage along a polyline.
+
+    Args:
+        route: The route vertices (WGS84 or Lambert93) and the sampling spacing in meters
+        coverage_df: The coverage data as a Polars DataFrame
+        coverage_index: The spatial index over the antennas
+        radius_by_tech: Radius per technology, from the preset and radius_* query parameters
+
+    Returns:
+        Covered and uncovered stretches per operator and technology
+    """
+    vertices = resolve_coordinates({str(i): point for i, point in enumerate(route.points)})
+    vertices = vertices.sort(pl.col('id').cast(pl.Int64))
+
+    try:
+        return compute_route_coverage(vertices, coverage_df, route.spacing, radius_by_tech, coverage_index)
+    except RouteError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/coverage/area", response_model=AreaCoverage)
+async def check_area_coverage(
+    zone: AreaRequest,
+    coverage_index: Annotated[SpatialIndex, Depends(get_coverage_index)],
+    radius_by_tech: Annotated[Dict[str, float], Depends(get_radius_by_tech)]
+) -> AreaCoverage:
+    """
+    Share of a zone covered per operator and technology.
+
+    Args:
+        zone: A polygon (list of rings), a bbox (two opposite corners) or
+            a commune INSEE code, and the grid resolution in meters
+        coverage_index: The spatial index over the antennas
+        radius_by_tech: Radius per technology, from the preset and radius_* query parameters
+
+    Returns:
+        Area, number of grid cells, resolution used and covered fractions
+    """
+    if zone.commune is not None:
+        try:
+            contour = await fetch_commune_contour(zone.commune)
+        except GeocodingError as e:
+            raise HTTPException(status_code=400, detail=f"Commune not found: {e}")
+        rings = []
+        for ring in contour:
+            xs, ys = convert_gps_to_lambert93_batch([p[0] for p in ring], [p[1] for p in ring])
+            rings.append(list(zip(xs, ys)))
+    elif zone.bbox is not None:
+        corners = resolve_ring(zone.bbox)
+        (x0, y0), (x1, y1) = corners
+        rings = [[(x0, y0), (x1, y0), (x1, y1), (x0, y1)]]
+    else:
+        rings = [resolve_ring(ring) for ring in zone.polygon]
+
+    try:
+        # Rasterizing a large zone takes seconds: keep the event loop free meanwhile
+        return await asyncio.to_thread(
+            compute_area_coverage, rings, coverage_index, zone.resolution, radius_by_tech
+        )
+    except AreaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/radius-presets", response_model=Dict[str, RadiusProfile])
+def list_radius_presets() -> Dict[str, RadiusProfile]:
+    """List the named radius profiles usable with the `preset` query parameter"""
+    return radius_presets.all()
+
+
+@app.put("/radius-presets/{name}", response_model=RadiusProfile)
+def save_radius_preset(name: str, profile: RadiusProfile) -> RadiusProfile:
+    """
+    Save a radius profile under a name, for later requests to refer to it.
+
+    Args:
+        name: The preset name
+        profile: Radius per technology in meters
 
-    return results
+    Returns:
+        The saved profile
+    """
+    try:
+        radius_presets.save(name, profile.model_dump(by_alias=True))
+    except RadiusPresetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return profile
+
+
+@app.post("/antennas/nearest", response_model=Dict[str, Dict[str, Dict[str, List[NearestAntenna]]]])
+def nearest_antennas(
+    request: NearestAntennasRequest,
+    coverage_index: Annotated[SpatialIndex, Depends(get_coverage_index)]
+) -> Dict[str, Dict[str, Dict[str, List[NearestAntenna]]]]:
+    """
+    Find the k nearest antennas per operator and technology.
+
+    Args:
+        request: Points (id -> coordinates) and the number k of antennas
+        coverage_index: The spatial index over the antennas
+
+    Returns:
+        Dict {id: {operator: {tech: [antenna, ...]}}}, closest first
+    """
+    if not request.points:
+        raise HTTPException(status_code=400, detail="No points provided")
+
+    points = resolve_coordinates(request.points)
+    nearest = nearest_to_dict(coverage_index.nearest(points, request.k))
+    return {point_id: nearest.get(point_id, {}) for point_id in request.points}
+
+
+@app.get("/antennas", response_model=List[Antenna])
+def antennas_in_bbox(
+    min_lon: Annotated[float, Query(ge=-180, le=180)],
+    min_lat: Annotated[float, Query(ge=-90, le=90)],
+    max_lon: Annotated[float, Query(ge=-180, le=180)],
+    max_lat: Annotated[float, Query(ge=-90, le=90)],
+    antenna_tiles: Annotated[AntennaTiles, Depends(get_antenna_tiles)],
+    limit: Annotated[int, Query(ge=1, le=MAX_BBOX_ANTENNAS)] = 5000
+) -> List[Antenna]:
+    """
+    List the antennas inside a WGS84 bounding box.
+
+    Args:
+        min_lon, min_lat, max_lon, max_lat: The bounding box
+        antenna_tiles: The tiled antenna table
+        limit: Maximum number of antennas returned
+
+    Returns:
+        List of antennas
+    """
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+
+    return antenna_tiles.bbox(min_lon, min_lat, max_lon, max_lat, limit).to_dicts()
+
+
+@app.get("/antennas/tiles/{z}/{x}/{y}", response_model=AntennaTile)
+def antenna_tile(
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    response: Response,
+    antenna_tiles: Annotated[AntennaTiles, Depends(get_antenna_tiles)]
+):
+    """
+    Antennas of a slippy map tile, clustered server-side when the tile is dense.
+
+    The ETag carries the dataset version: browsers and proxies revalidate
+    their copy on each use and get a 304 until the dataset changes.
+    """
+    if not 0 <= z <= TILE_KEY_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    tile = antenna_tiles.tile(z, x, y)
+    headers = {
+        "ETag": f'"{tile["version"]}-{z}-{x}-{y}"',
+        "Cache-Control": TILE_CACHE_CONTROL,
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return tile
+
+
+@app.post("/antennas/delta", response_model=DatasetUpdate)
+def apply_antenna_delta(file: UploadFile) -> DatasetUpdate:
+    """
+    Apply a delta file (added, removed or modified antennas) to the dataset.
+
+    The spatial index and the antenna tiles are patched rather than rebuilt,
+    and only the cached tiles holding a changed antenna are dropped. The
+    updated dataset is swapped in once fully built.
+
+    Args:
+        file: CSV with the coverage columns plus an `action` column
+            (add, remove or modify)
+
+    Returns:
+        Previous and new dataset versions, row counts and update duration
+    """
+    start = time.perf_counter()
+    with dataset_lock:
+        dataset = get_dataset()
+
+        try:
+            delta = load_coverage_delta_from_csv(file.file)
+            updated_df, removed, added = apply_coverage_delta(dataset.df, delta)
+        except DeltaError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        version = compute_dataset_version(updated_df)
+        # Published with a single assignment: requests see the old or the new snapshot, never a mix
+        app.state.dataset = CoverageDataset(
+            updated_df,
+            dataset.index.with_delta(removed, added),
+            dataset.tiles.with_delta(removed, added, version),
+            version,
+        )
+
+    duration_ms = (time.perf_counter() - start) * 1000
+    actions = delta['action'].value_counts()
+    counts = dict(zip(actions['action'].to_list(), actions['count'].to_list()))
+    logger.info(f"🔄 Applied delta of {delta.height} rows in {duration_ms:.1f} ms, version {version}")
+    return DatasetUpdate(
+        previous_version=dataset.version,
+        version=version,
+        added=counts.get('add', 0),
+        removed=counts.get('remove', 0),
+        modified=counts.get('modify', 0),
+        towers_count=len(updated_df),
+        duration_ms=duration_ms,
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag: `*`, or a list of
+    tags compared weakly (a `W/` prefix is ignored)
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+
+def resolve_coordinates(coordinates: Dict[str, CoordinateInput]) -> pl.DataFrame:
+    """
+    Project pre-geocoded coordinates to Lambert93.
+    WGS84 points are converted together in a single pyproj call.
+
+    Returns:
+        DataFrame with columns id, x, y (Lambert93)
+    Raises:
+        HTTPException: 422 if a WGS84 point cannot be projected
+    """
+    ids, xs, ys = [], [], []
+    gps_ids, lons, lats = [], [], []
+
+    for address_id, point in coordinates.items():
+        if point.x is not None and point.y is not None:
+            ids.append(address_id)
+            xs.append(point.x)
+            ys.append(point.y)
+        else:
+            gps_ids.append(address_id)
+            lons.append(point.lon)
+            lats.append(point.lat)
+
+    gps_xs, gps_ys = convert_gps_to_lambert93_batch(lons, lats)
+    # Valid WGS84 points near the poles have no Lambert93 projection
+    unprojectable = [
+        address_id for address_id, x, y in zip(gps_ids, gps_xs, gps_ys)
+        if not (math.isfinite(x) and math.isfinite(y))
+    ]
+    if unprojectable:
+        raise HTTPException(status_code=422, detail=f"Coordinates outside the Lambert93 projection: {unprojectable}")
+
+    return pl.DataFrame(
+        {"id": ids + gps_ids, "x": xs + gps_xs, "y": ys + gps_ys},
+        schema={"id": pl.Utf8, "x": pl.Float64, "y": pl.Float64}
+    )
+
+
+def resolve_ring(points: List[CoordinateInput]) -> List[tuple]:
+    """Project an ordered list of points to Lambert93 (x, y) tuples"""
+    ring = resolve_coordinates({str(i): point for i, point in enumerate(points)})
+    ring = ring.sort(pl.col('id').cast(pl.Int64))
+    return list(zip(ring['x'].to_list(), ring['y'].to_list()))
+
+
+def coverage_to_response(coverage_dict: Dict) -> Dict:
+    """
+    Coverage calculation result as an AddressCoverage dict (by alias).
+    The calculator returns: {'Orange': {'2G': bool, '3G': bool, '4G': bool}, ...}
+    """
+    return {
+        field: {tech: coverage_dict.get(operator, {}).get(tech, False) for tech in TECHNOLOGIES}
+        for operator, field in RESPONSE_OPERATORS.items()
+    }
 
 
 def convert_coverage_to_model(coverage_dict: Dict) -> AddressCoverage:
@@ -140,44 +691,7 @@ def convert_coverage_to_model(coverage_dict: Dict) -> AddressCoverage:
     Convert coverage calculation result to AddressCoverage model.
     The calculator returns: {'Orange': {'2G': bool, '3G': bool, '4G': bool}, ...}
     """
-    
-    # Default no coverage
-    default = OperatorCoverage(**{"2G": False, "3G": False, "4G": False})
-    
-    # Build the response
-    return AddressCoverage(
-        orange=OperatorCoverage(
-            **{
-                "2G": coverage_dict.get('Orange', {}).get('2G', False),
-                "3G": coverage_dict.get('Orange', {}).get('3G', False),
-                "4G": coverage_dict.get('Orange', {}).get('4G', False)
-            }
-        ) if 'Orange' in coverage_dict else default,
-        
-        SFR=OperatorCoverage(
-            **{
-                "2G": coverage_dict.get('SFR', {}).get('2G', False),
-                "3G": coverage_dict.get('SFR', {}).get('3G', False),
-                "4G": coverage_dict.get('SFR', {}).get('4G', False)
-            }
-        ) if 'SFR' in coverage_dict else default,
-        
-        bouygues=OperatorCoverage(
-            **{
-                "2G": coverage_dict.get('Bouygues', {}).get('2G', False),
-                "3G": coverage_dict.get('Bouygues', {}).get('3G', False),
-                "4G": coverage_dict.get('Bouygues', {}).get('4G', False)
-            }
-        ) if 'Bouygues' in coverage_dict else default,
-        
-        Free=OperatorCoverage(
-            **{
-                "2G": coverage_dict.get('Free', {}).get('2G', False),
-                "3G": coverage_dict.get('Free', {}).get('3G', False),
-                "4G": coverage_dict.get('Free', {}).get('4G', False)
-            }
-        ) if 'Free' in coverage_dict else default
-    )
+    return AddressCoverage(**coverage_to_response(coverage_dict))
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,16 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Dict, List, Optional
+
+from services.coverage_loader import LAMBERT93_BOUNDS
+from services.radius_presets import MAX_RADIUS
+
+MIN_X, MIN_Y, MAX_X, MAX_Y = LAMBERT93_BOUNDS
+
+# Finite coordinates within WGS84 ranges and the Lambert93 projection bounds
+Longitude = Annotated[float, Field(ge=-180, le=180, allow_inf_nan=False)]
+Latitude = Annotated[float, Field(ge=-90, le=90, allow_inf_nan=False)]
+LambertX = Annotated[float, Field(ge=MIN_X, le=MAX_X, allow_inf_nan=False)]
+LambertY = Annotated[float, Field(ge=MIN_Y, le=MAX_Y, allow_inf_nan=False)]
 
 class OperatorCoverage(BaseModel):
     """Result for coverage"""
@@ -23,4 +35,142 @@ class GeocodeResult(BaseModel):
     latitude: float
     x_lambert93: float
     y_lambert93: float
-    address_found: str
\ No newline at end of file
+    address_found: str
+
+class CoordinateInput(BaseModel):
+    """Pre-geocoded point, either WGS84 (lon, lat) or Lambert93 (x, y) within the projection bounds"""
+    lon: Optional[Longitude] = None
+    lat: Optional[Latitude] = None
+    x: Optional[LambertX] = None
+    y: Optional[LambertY] = None
+
+    @model_validator(mode="after")
+    def check_single_coordinate_pair(self):
+        has_gps = self.lon is not None and self.lat is not None
+        has_lambert93 = self.x is not None and self.y is not None
+        if has_gps == has_lambert93:
+            raise ValueError("Provide either lon/lat (WGS84) or x/y (Lambert93)")
+        return self
+
+class CoordinateColumns(BaseModel):
+    """Many pre-geocoded points as columns, either lon/lat (WGS84) or x/y (Lambert93)"""
+    lon: Optional[List[Longitude]] = None
+    lat: Optional[List[Latitude]] = None
+    x: Optional[List[LambertX]] = None
+    y: Optional[List[LambertY]] = None
+
+    @model_validator(mode="after")
+    def check_single_coordinate_pair(self):
+        has_gps = self.lon is not None and self.lat is not None
+        has_lambert93 = self.x is not None and self.y is not None
+        if has_gps == has_lambert93:
+            raise ValueError("Provide either lon/lat (WGS84) or x/y (Lambert93)")
+        first, second = (self.lon, self.lat) if has_gps else (self.x, self.y)
+        if len(first) != len(second):
+            raise ValueError("Coordinate columns must have the same length")
+        return self
+
+class CoverageColumns(BaseModel):
+    """Coverage of many points as columns, in the order of the request"""
+    count: int
+    coverage: Dict[str, Dict[str, List[bool]]]
+
+class NearestAntennasRequest(BaseModel):
+    """Points for which to look up the k nearest antennas"""
+    points: Dict[str, CoordinateInput]
+    k: int = Field(default=3, ge=1, le=50)
+
+class NearestAntenna(BaseModel):
+    """An antenna and its distance to the queried point"""
+    x_lambert93: float
+    y_lambert93: float
+    distance: float
+
+class Antenna(BaseModel):
+    """An antenna with its position in WGS84 and Lambert93"""
+    operator: str
+    lon: float
+    lat: float
+    x_lambert93: float
+    y_lambert93: float
+    two_g: bool = Field(alias="2G")
+    three_g: bool = Field(alias="3G")
+    four_g: bool = Field(alias="4G")
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+class AntennaCluster(BaseModel):
+    """Group of antennas shown as a single marker"""
+    lon: float
+    lat: float
+    count: int
+
+class AntennaTile(BaseModel):
+    """Antennas of a slippy map tile, clustered when the tile is dense"""
+    z: int
+    x: int
+    y: int
+    version: str
+    clustered: bool
+    antennas: List[Antenna]
+    clusters: List[AntennaCluster]
+
+class RouteRequest(BaseModel):
+    """Polyline along which to evaluate coverage"""
+    points: List[CoordinateInput] = Field(min_length=2)
+    spacing: float = Field(default=100.0, gt=0)
+
+class CoverageInterval(BaseModel):
+    """Stretch of a route, in meters from its start"""
+    start: float
+    end: float
+    covered: bool
+
+class RouteCoverage(BaseModel):
+    """Coverage intervals along a route, per operator and technology"""
+    length: float
+    samples: int
+    coverage: Dict[str, Dict[str, List[CoverageInterval]]]
+
+class AreaRequest(BaseModel):
+    """Zone to evaluate: a polygon, a bounding box or a commune (INSEE code)"""
+    polygon: Optional[List[List[CoordinateInput]]] = None
+    bbox: Optional[List[CoordinateInput]] = Field(default=None, min_length=2, max_length=2)
+    commune: Optional[str] = None
+    resolution: float = Field(default=200.0, gt=0)
+
+    @model_validator(mode="after")
+    def check_single_zone(self):
+        zones = [self.polygon, self.bbox, self.commune]
+        if sum(zone is not None for zone in zones) != 1:
+            raise ValueError("Provide exactly one of polygon, bbox or commune")
+        return self
+
+class AreaCoverage(BaseModel):
+    """Covered share of a zone, per operator and technology"""
+    area: float
+    cells: int
+    resolution: float
+    coverage: Dict[str, Dict[str, float]]
+
+class DatasetUpdate(BaseModel):
+    """Report of a delta applied to the antenna dataset"""
+    previous_version: str
+    version: str
+    added: int
+    removed: int
+    modified: int
+    towers_count: int
+    duration_ms: float
+
+class RadiusProfile(BaseModel):
+    """Coverage radius per technology, in meters"""
+    two_g: float = Field(alias="2G", gt=0, le=MAX_RADIUS, allow_inf_nan=False)
+    three_g: float = Field(alias="3G", gt=0, le=MAX_RADIUS, allow_inf_nan=False)
+    four_g: float = Field(alias="4G", gt=0, le=MAX_RADIUS, allow_inf_nan=False)
+
+    model_config = {
+        "populate_by_name": True
+    }
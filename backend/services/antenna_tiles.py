@@ -0,0 +1,233 @@
+import copy
+import math
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+import polars as pl
+from typing import Optional
+
+from services.geocoding import convert_lambert93_to_gps_batch
+
+# Zoom level of the tile key every antenna is sorted by
+TILE_KEY_ZOOM = 20
+# Tiles holding more antennas than this are clustered
+MAX_TILE_ANTENNAS = 1000
+# Clusters are built on sub-tiles CLUSTER_DEPTH zoom levels below the tile
+CLUSTER_DEPTH = 4
+# Number of built tiles kept in memory
+TILE_CACHE_SIZE = 2048
+# A bbox query reads at most this many tiles
+MAX_BBOX_TILES = 16
+# Latitude limits of the Web Mercator projection
+MAX_LATITUDE = 85.0511
+
+
+def _tile_xy(lon: pl.Expr, lat: pl.Expr, zoom: int) -> tuple:
+    """Web Mercator (slippy map) tile coordinates of lon/lat at a zoom level"""
+    n = 2 ** zoom
+    lat_rad = lat * math.pi / 180
+    tile_x = ((lon + 180) / 360 * n).floor().clip(0, n - 1).cast(pl.Int64)
+    tile_y = (
+        (1 - (lat_rad.tan() + 1 / lat_rad.cos()).log() / math.pi) / 2 * n
+    ).floor().clip(0, n - 1).cast(pl.Int64)
+    return tile_x, tile_y
+
+
+def _interleave_bits(tile_x: pl.Expr, tile_y: pl.Expr, bits: int) -> pl.Expr:
+    """Morton code (quadkey order) of tile coordinates"""
+    code = pl.lit(0, dtype=pl.Int64)
+    for i in range(bits):
+        code = (
+            code
+            + ((tile_x // (2 ** i)) % 2) * (2 ** (2 * i))
+            + ((tile_y // (2 ** i)) % 2) * (2 ** (2 * i + 1))
+        )
+    return code
+
+
+def tile_of(lon: float, lat: float, zoom: int) -> tuple:
+    """Slippy map tile (x, y) holding lon/lat at a zoom level"""
+    n = 2 ** zoom
+    lat_rad = math.radians(min(max(lat, -MAX_LATITUDE), MAX_LATITUDE))
+    tile_x = int((lon + 180) / 360 * n)
+    tile_y = int((1 - math.log(math.tan(lat_rad) + 1 / math.cos(lat_rad)) / math.pi) / 2 * n)
+    return min(max(tile_x, 0), n - 1), min(max(tile_y, 0), n - 1)
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple:
+    """WGS84 bounds (min_lon, min_lat, max_lon, max_lat) of a slippy map tile"""
+    n = 2 ** z
+
+    def lat_of(tile_y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360 - 180, lat_of(y + 1), (x + 1) / n * 360 - 180, lat_of(y)
+
+
+class AntennaTiles:
+    """
+    Antennas sorted by the Morton code of their tile at TILE_KEY_ZOOM.
+
+    In Morton order every tile of zoom <= TILE_KEY_ZOOM is a contiguous
+    range of rows, so a tile lookup is two binary searches.
+    """
+
+    def __init__(self, df: pl.DataFrame, version: str):
+        self.version = version
+        self.antennas = self._with_tile_keys(df).sort('tile_key')
+        self._tile_keys = self.antennas['tile_key'].to_list()
+        self._tile_cache: OrderedDict = OrderedDict()
+        # Tiles are requested from several threads of the threadpool
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _with_tile_keys(df: pl.DataFrame) -> pl.DataFrame:
+        """Antennas with their WGS84 position and the Morton key of their tile"""
+        lons, lats = convert_lambert93_to_gps_batch(
+            df['x_lambert93'].cast(pl.Float64).to_list(),
+            df['y_lambert93'].cast(pl.Float64).to_list(),
+        )
+        antennas = df.select(
+            'operator',
+            pl.col('x_lambert93').cast(pl.Float64),
+            pl.col('y_lambert93').cast(pl.Float64),
+            '2G', '3G', '4G',
+        ).with_columns(
+            pl.Series('lon', lons, dtype=pl.Float64),
+            pl.Series('lat', lats, dtype=pl.Float64),
+        )
+        tile_x, tile_y = _tile_xy(pl.col('lon'), pl.col('lat'), TILE_KEY_ZOOM)
+        return antennas.with_columns(_interleave_bits(tile_x, tile_y, TILE_KEY_ZOOM).alias('tile_key'))
+
+    def with_delta(self, removed: pl.DataFrame, added: pl.DataFrame, version: str) -> "AntennaTiles":
+        """
+        Copy of the table with antennas removed and added.
+
+        Cached tiles are kept, with the version they were built with,
+        unless they hold one of the changed antennas.
+        Args:
+            removed: antennas to remove (dataset columns)
+            added: antennas to add (dataset columns)
+            version: version of the updated dataset
+        """
+        removed = self._with_tile_keys(removed)
+        added = self._with_tile_keys(added)
+
+        tiles = copy.copy(self)
+        tiles.version = version
+        tiles.antennas = pl.concat([
+            self.antennas.join(removed, on=['operator', 'x_lambert93', 'y_lambert93'], how='anti'),
+            added,
+        ]).sort('tile_key')
+        tiles._tile_keys = tiles.antennas['tile_key'].to_list()
+
+        changed_keys = sorted(removed['tile_key'].to_list() + added['tile_key'].to_list())
+        with self._cache_lock:
+            cached = list(self._tile_cache.items())
+        tiles._tile_cache = OrderedDict(
+            (key, tile) for key, tile in cached
+            if not self._holds_any(changed_keys, *key)
+        )
+        tiles._cache_lock = threading.Lock()
+        return tiles
+
+    def _holds_any(self, keys: list, z: int, x: int, y: int) -> bool:
+        """Whether one of the sorted tile keys lies inside the tile z/x/y"""
+        shift = 4 ** (TILE_KEY_ZOOM - z)
+        first = self._morton(x, y, z) * shift
+        i = bisect_left(keys, first)
+        return i < len(keys) and keys[i] < first + shift
+
+    def _tile_rows(self, z: int, x: int, y: int) -> pl.DataFrame:
+        """Antennas inside the tile z/x/y"""
+        shift = 4 ** (TILE_KEY_ZOOM - z)
+        first = self._morton(x, y, z) * shift
+        start = bisect_left(self._tile_keys, first)
+        end = bisect_left(self._tile_keys, first + shift, lo=start)
+        return self.antennas.slice(start, end - start)
+
+    @staticmethod
+    def _morton(x: int, y: int, bits: int) -> int:
+        """Morton code of a single tile, same bit layout as _interleave_bits"""
+        code = 0
+        for i in range(bits):
+            code |= ((x >> i) & 1) << (2 * i)
+            code |= ((y >> i) & 1) << (2 * i + 1)
+        return code
+
+    def tile(self, z: int, x: int, y: int) -> dict:
+        """
+        Antennas of the tile z/x/y, or clusters of them if the tile is dense.
+        Built tiles are kept in a LRU cache; tiles are built outside the
+        cache lock, so concurrent requests for a new tile may both build it.
+        Returns:
+            dict with the tile coordinates, the dataset version the tile was
+            built with, and either
+            antennas (clustered=False) or clusters (clustered=True)
+        """
+        key = (z, x, y)
+        with self._cache_lock:
+            tile = self._tile_cache.get(key)
+            if tile is not None:
+                self._tile_cache.move_to_end(key)
+                return tile
+
+        tile = self._build_tile(z, x, y)
+        with self._cache_lock:
+            self._tile_cache[key] = tile
+            if len(self._tile_cache) > TILE_CACHE_SIZE:
+                self._tile_cache.popitem(last=False)
+        return tile
+
+    def _build_tile(self, z: int, x: int, y: int) -> dict:
+        """Antennas or clusters of the tile z/x/y"""
+        rows = self._tile_rows(z, x, y)
+        tile = {"z": z, "x": x, "y": y, "version": self.version}
+
+        if rows.height <= MAX_TILE_ANTENNAS or z >= TILE_KEY_ZOOM:
+            return {**tile, "clustered": False, "antennas": rows.drop('tile_key').to_dicts(), "clusters": []}
+
+        # Dense tile: group antennas by sub-tile, one cluster per sub-tile
+        depth = min(CLUSTER_DEPTH, TILE_KEY_ZOOM - z)
+        clusters = (
+            rows.group_by((pl.col('tile_key') // 4 ** (TILE_KEY_ZOOM - z - depth)).alias('sub_tile'))
+            .agg(
+                pl.col('lon').mean(),
+                pl.col('lat').mean(),
+                pl.len().alias('count'),
+            )
+            .sort('sub_tile')
+            .drop('sub_tile')
+        )
+        return {**tile, "clustered": True, "antennas": [], "clusters": clusters.to_dicts()}
+
+    def bbox(
+        self,
+        min_lon: float,
+        min_lat: float,
+        max_lon: float,
+        max_lat: float,
+        limit: Optional[int] = None
+    ) -> pl.DataFrame:
+        """
+        Antennas inside a WGS84 bounding box.
+
+        Reads the rows of the few tiles covering the box (at the deepest
+        zoom where at most MAX_BBOX_TILES are needed), then filters them.
+        """
+        for z in range(TILE_KEY_ZOOM, -1, -1):
+            x0, y0 = tile_of(min_lon, max_lat, z)
+            x1, y1 = tile_of(max_lon, min_lat, z)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_BBOX_TILES:
+                break
+
+        rows = pl.concat([
+            self._tile_rows(z, x, y)
+            for x in range(x0, x1 + 1)
+            for y in range(y0, y1 + 1)
+        ])
+        rows = rows.filter(
+            pl.col('lon').is_between(min_lon, max_lon)
+            & pl.col('lat').is_between(min_lat, max_lat)
+        ).drop('tile_key')
+        return rows.head(limit) if limit is not None else rows
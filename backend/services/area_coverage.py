@@ -0,0 +1,245 @@
+import math
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from services.coverage_calculator import TECHNOLOGIES, DEFAULT_RADIUS_BY_TECH
+from services.spatial_index import SpatialIndex
+
+DEFAULT_RESOLUTION = 200.0  # meters
+# The resolution is coarsened so that an area never exceeds this many cells
+MAX_AREA_CELLS = 2000000
+# Rows evaluated together; bounds the memory used by a request
+BAND_ROWS = 64
+
+Ring = List[Tuple[float, float]]
+
+
+class AreaError(Exception):
+    """Custom exception for invalid areas."""
+
+
+def _edges(rings: List[Ring]) -> pl.DataFrame:
+    """All edges (x1, y1, x2, y2) of the rings, closed if needed"""
+    x1, y1, x2, y2 = [], [], [], []
+    for ring in rings:
+        if len(ring) < 3:
+            raise AreaError("A polygon ring needs at least 3 points.")
+        closed = ring if ring[0] == ring[-1] else ring + [ring[0]]
+        for (ax, ay), (bx, by) in zip(closed, closed[1:]):
+            x1.append(ax)
+            y1.append(ay)
+            x2.append(bx)
+            y2.append(by)
+    return pl.DataFrame(
+        {"x1": x1, "y1": y1, "x2": x2, "y2": y2},
+        schema={"x1": pl.Float64, "y1": pl.Float64, "x2": pl.Float64, "y2": pl.Float64}
+    )
+
+
+def polygon_spans(
+    edges: pl.DataFrame,
+    origin: Tuple[float, float],
+    resolution: float,
+    first_row: int,
+    last_row: int
+    ) -> pl.DataFrame:
+    """
+    Spans of grid cells whose center lies inside the polygon, for a band of rows.
+
+    Scanline rasterization with the even-odd rule: each row center crosses
+    the edges at sorted x positions, and consecutive pairs of crossings
+    delimit the inside spans of the row.
+    Args:
+        edges: polygon edges (x1, y1, x2, y2) in Lambert93
+        origin: lower-left corner (x, y) of the grid
+        resolution: cell size (in meters)
+        first_row, last_row: band of rows to rasterize (last_row excluded)
+    Returns:
+        DataFrame with columns row, start, end (columns, end excluded)
+    """
+    x0, y0 = origin
+    rows = pl.DataFrame({"row": pl.int_range(first_row, last_row, eager=True)}).with_columns(
+        (y0 + (pl.col('row') + 0.5) * resolution).alias('y')
+    )
+    crossings = (
+        rows.join(edges, how='cross')
+        .filter(
+            ((pl.col('y1') <= pl.col('y')) & (pl.col('y') < pl.col('y2')))
+            | ((pl.col('y2') <= pl.col('y')) & (pl.col('y') < pl.col('y1')))
+        )
+        .select(
+            'row',
+            (pl.col('x1') + (pl.col('y') - pl.col('y1')) * (pl.col('x2') - pl.col('x1'))
+             / (pl.col('y2') - pl.col('y1'))).alias('x_cross'),
+        )
+        .sort('row', 'x_cross')
+        .with_columns(pl.int_range(pl.len()).over('row').alias('rank'))
+    )
+    # First column whose center is at or after each crossing
+    column = ((pl.col('x_cross') - x0) / resolution - 0.5).ceil().cast(pl.Int64)
+    starts = crossings.filter(pl.col('rank') % 2 == 0).select('row', 'rank', column.alias('start'))
+    ends = crossings.filter(pl.col('rank') % 2 == 1).select(
+        'row', (pl.col('rank') - 1).alias('rank'), column.alias('end')
+    )
+    return (
+        starts.join(ends, on=['row', 'rank'])
+        .filter(pl.col('end') > pl.col('start'))
+        .select('row', 'start', 'end')
+    )
+
+
+def coverage_spans(
+    antennas: pl.DataFrame,
+    radius: float,
+    origin: Tuple[float, float],
+    resolution: float,
+    first_row: int,
+    last_row: int
+    ) -> pl.DataFrame:
+    """
+    Spans of grid cells whose center is within radius of an antenna, per operator.
+
+    Each antenna disk is cut into one span per row it reaches; the spans of
+    an operator are then merged on every row.
+    Args:
+        antennas: Polars DataFrame of antennas having the technology
+        radius: coverage radius (in meters)
+        origin: lower-left corner (x, y) of the grid
+        resolution: cell size (in meters)
+        first_row, last_row: band of rows to cover (last_row excluded)
+    Returns:
+        DataFrame with columns operator, row, start, end (columns, end excluded),
+        spans of the same operator and row never overlap
+    """
+    x0, y0 = origin
+    radius = float(radius)
+    half_width = (radius ** 2 - (y0 + (pl.col('row') + 0.5) * resolution - pl.col('y_lambert93')) ** 2).sqrt()
+    return (
+        antennas
+        .select('operator', pl.col('x_lambert93').cast(pl.Float64), pl.col('y_lambert93').cast(pl.Float64))
+        .with_columns(
+            ((pl.col('y_lambert93') - radius - y0) / resolution - 0.5).ceil().cast(pl.Int64)
+            .clip(lower_bound=first_row).alias('row_start'),
+            ((pl.col('y_lambert93') + radius - y0) / resolution - 0.5).floor().cast(pl.Int64)
+            .clip(upper_bound=last_row - 1).alias('row_end'),
+        )
+        .filter(pl.col('row_end') >= pl.col('row_start'))
+        .with_columns(pl.int_ranges('row_start', pl.col('row_end') + 1).alias('row'))
+        .explode('row')
+        .with_columns(half_width.alias('half_width'))
+        .select(
+            'operator', 'row',
+            ((pl.col('x_lambert93') - pl.col('half_width') - x0) / resolution - 0.5).ceil()
+            .cast(pl.Int64).alias('start'),
+            (((pl.col('x_lambert93') + pl.col('half_width') - x0) / resolution - 0.5).floor() + 1)
+            .cast(pl.Int64).alias('end'),
+        )
+        .filter(pl.col('end') > pl.col('start'))
+        .pipe(_merge_spans, ['operator', 'row'])
+    )
+
+
+def _covered_cells(
+    spans: pl.DataFrame,
+    antennas: pl.DataFrame,
+    radius: float,
+    origin: Tuple[float, float],
+    resolution: float,
+    first_row: int,
+    last_row: int
+    ) -> pl.DataFrame:
+    """Number of cells of the spans covered per operator"""
+    return (
+        coverage_spans(antennas, radius, origin, resolution, first_row, last_row)
+        .join(spans, on='row', suffix='_area')
+        .select(
+            'operator',
+            (pl.min_horizontal('end', 'end_area') - pl.max_horizontal('start', 'start_area'))
+            .clip(lower_bound=0).alias('cells'),
+        )
+        .group_by('operator')
+        .agg(pl.col('cells').sum())
+    )
+
+
+def _merge_spans(spans: pl.DataFrame, keys: List[str]) -> pl.DataFrame:
+    """Union of overlapping or touching spans within each group"""
+    return (
+        spans.sort(*keys, 'start')
+        .with_columns(pl.col('end').cum_max().shift(1).over(keys).alias('reached'))
+        # Rows are sorted by group, so a global counter numbers the runs
+        .with_columns((pl.col('start') > pl.col('reached')).fill_null(True).cum_sum().alias('run'))
+        .group_by(*keys, 'run')
+        .agg(pl.col('start').min(), pl.col('end').max())
+        .drop('run')
+    )
+
+
+def compute_area_coverage(
+    rings: List[Ring],
+    index: SpatialIndex,
+    resolution: float = DEFAULT_RESOLUTION,
+    radius_by_tech: Optional[dict[str, float]] = None
+    ) -> Dict:
+    """
+    Share of an area covered per operator and technology.
+
+    The polygon and the antenna disks are both rasterized as spans of grid
+    cells, so the covered cells are counted by intersecting spans rather
+    than by testing each cell. Rows are processed in bands, each reading
+    from the index only the antennas within the band plus the radius.
+    Args:
+        rings: polygon rings in Lambert93 (even-odd rule, so holes and
+            multipolygons are plain extra rings)
+        index: spatial index over the antennas
+        resolution: requested cell size (in meters), coarsened if needed
+        radius_by_tech: dict of radius per technology (in meters)
+    Returns:
+        dict {area, cells, resolution, coverage: {operator: {tech: fraction}}}
+    """
+    if radius_by_tech is None:
+        radius_by_tech = DEFAULT_RADIUS_BY_TECH
+    if not rings:
+        raise AreaError("The area has no polygon.")
+
+    edges = _edges(rings)
+    min_x, max_x = edges['x1'].min(), edges['x1'].max()
+    min_y, max_y = edges['y1'].min(), edges['y1'].max()
+    bbox_area = max(max_x - min_x, 1.0) * max(max_y - min_y, 1.0)
+    resolution = max(float(resolution), math.sqrt(bbox_area / MAX_AREA_CELLS))
+    origin = (min_x, min_y)
+    n_rows = max(math.ceil((max_y - min_y) / resolution), 1)
+
+    total_cells = 0
+    covered_cells: Dict[Tuple[str, str], int] = {}
+    for first_row in range(0, n_rows, BAND_ROWS):
+        last_row = min(first_row + BAND_ROWS, n_rows)
+        spans = polygon_spans(edges, origin, resolution, first_row, last_row)
+        if spans.height == 0:
+            continue
+        total_cells += (spans['end'] - spans['start']).sum()
+
+        for tech in TECHNOLOGIES:
+            radius = radius_by_tech[tech]
+            antennas = index.antennas_in_box(
+                min_x - radius, min_y + first_row * resolution - radius,
+                max_x + radius, min_y + last_row * resolution + radius,
+            ).filter(pl.col('tech') == tech)
+            counts = _covered_cells(spans, antennas, radius, origin, resolution, first_row, last_row)
+            for op, count in counts.iter_rows():
+                covered_cells[(op, tech)] = covered_cells.get((op, tech), 0) + count
+
+    operators = index.antennas['operator'].unique().sort().to_list()
+    coverage = {
+        op: {
+            tech: covered_cells.get((op, tech), 0) / total_cells if total_cells else 0.0
+            for tech in TECHNOLOGIES
+        }
+        for op in operators
+    }
+    return {
+        "area": total_cells * resolution ** 2,
+        "cells": total_cells,
+        "resolution": resolution,
+        "coverage": coverage,
+    }
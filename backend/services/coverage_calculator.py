@@ -1,6 +1,30 @@
+import math
 import polars as pl
+from functools import lru_cache
 from typing import Dict, Optional
 
+TECHNOLOGIES = ["2G", "3G", "4G"]
+DEFAULT_RADIUS_BY_TECH = {"2G": 30000, "3G": 5000, "4G": 10000}
+
+# Grid cells per radius used by the batch computation
+CELL_SUBDIVISIONS = 2
+
+
+@lru_cache(maxsize=64)
+def reachable_offsets(cell_size: float, radius: float) -> pl.DataFrame:
+    """Cell offsets that can intersect the disk of a point of the center cell"""
+    span = max(math.ceil(radius / cell_size), 1)
+    return pl.DataFrame(
+        [
+            (dx, dy)
+            for dx in range(-span, span + 1)
+            for dy in range(-span, span + 1)
+            if (max(abs(dx) - 1, 0) ** 2 + max(abs(dy) - 1, 0) ** 2) * cell_size ** 2 <= radius ** 2
+        ],
+        schema={"dx": pl.Int64, "dy": pl.Int64},
+        orient="row",
+    )
+
 def compute_coverage_for_point(
     x: float,
     y: float,
@@ -18,7 +42,7 @@ def compute_coverage_for_point(
         dict {operator: {2G: bool, 3G: bool, 4G: bool}}
     """
     if radius_by_tech is None:
-        radius_by_tech = {"2G": 30000, "3G": 5000, "4G": 10000}
+        radius_by_tech = DEFAULT_RADIUS_BY_TECH
     
     # Calculate distance for ALL antennas once
     df_with_distance = df.with_columns([
@@ -32,7 +56,7 @@ def compute_coverage_for_point(
         op_df = df_with_distance.filter(pl.col('operator') == op)
         cover = {}
         
-        for tech in ["2G", "3G", "4G"]:
+        for tech in TECHNOLOGIES:
             # Check if any antenna with this tech (=1) is within range
             has_coverage = op_df.filter(
                 (pl.col(tech) == 1) &  # Has the technology
@@ -43,4 +67,185 @@ def compute_coverage_for_point(
         
         result[op] = cover
     
-    return result
\ No newline at end of file
+    return result
+
+
+def compute_coverage_for_points(
+    points: pl.DataFrame,
+    df: pl.DataFrame,
+    radius_by_tech: Optional[dict[str, float]] = None,
+    index=None
+    ) -> Dict[str, Dict[str, dict[str, bool]]]:
+    """
+    Calculates the coverage for many points in one vectorized pass.
+
+    Antennas and points are bucketed on a grid of radius / CELL_SUBDIVISIONS
+    cells (or on the cached grids of the index), so each point only visits
+    the cells of reachable_offsets that can intersect its disk; cells lying
+    entirely inside the disk are accepted without checking their antennas.
+    Args:
+        points: Polars DataFrame with columns id, x, y (Lambert93)
+        df: Polars DataFrame of antennas
+        radius_by_tech: dict of radius per technology (in meters)
+    If None, defaults to {"2G": 30000, "3G": 5000, "4G": 10000}.
+        index: optional SpatialIndex over df, whose cached grids avoid
+            bucketing the antennas on every call
+    Returns:
+        dict {id: {operator: {2G: bool, 3G: bool, 4G: bool}}}
+    """
+    if radius_by_tech is None:
+        radius_by_tech = DEFAULT_RADIUS_BY_TECH
+
+    ids = points['id'].cast(pl.Utf8).to_list()
+    operators = df['operator'].unique().to_list()
+    result = {
+        point_id: {op: {tech: False for tech in TECHNOLOGIES} for op in operators}
+        for point_id in ids
+    }
+    if not ids or not operators:
+        return result
+
+    points = points.select(
+        pl.col('id').cast(pl.Utf8),
+        pl.col('x').cast(pl.Float64),
+        pl.col('y').cast(pl.Float64),
+    )
+
+    if index is not None:
+        hits = index.coverage_hits(points, radius_by_tech)
+    else:
+        hits = compute_coverage_hits(points, df, radius_by_tech)
+    for point_id, op, tech in hits.iter_rows():
+        result[point_id][op][tech] = True
+
+    return result
+
+
+def compute_coverage_hits(
+    points: pl.DataFrame,
+    df: pl.DataFrame,
+    radius_by_tech: Optional[dict[str, float]] = None
+    ) -> pl.DataFrame:
+    """
+    Covered (point, operator, technology) triples for many points.
+    Args:
+        points: Polars DataFrame with columns id, x, y (Lambert93)
+        df: Polars DataFrame of antennas
+        radius_by_tech: dict of radius per technology (in meters)
+    Returns:
+        DataFrame with columns id, operator, tech, one row per coverage
+    """
+    if radius_by_tech is None:
+        radius_by_tech = DEFAULT_RADIUS_BY_TECH
+
+    frames = [
+        find_covering_operators(points, df.filter(pl.col(tech)), radius_by_tech[tech])
+        .with_columns(pl.lit(tech).alias('tech'))
+        for tech in TECHNOLOGIES
+    ]
+    return pl.concat(frames)
+
+
+def find_covering_operators(
+    points: pl.DataFrame,
+    antennas: pl.DataFrame,
+    radius: float
+    ) -> pl.DataFrame:
+    """
+    Operators having an antenna within radius of each point.
+
+    Antennas are bucketed on a grid of radius / CELL_SUBDIVISIONS cells,
+    then searched with find_covering_operators_on_grid.
+    Args:
+        points: Polars DataFrame with columns id, x, y (Lambert93)
+        antennas: Polars DataFrame of antennas having the technology
+        radius: coverage radius (in meters)
+    Returns:
+        DataFrame with columns id, operator, one row per covering operator
+    """
+    cell_size = max(float(radius), 1.0) / CELL_SUBDIVISIONS
+    return find_covering_operators_on_grid(points, bucket_antennas(antennas, cell_size), cell_size, radius)
+
+
+def bucket_antennas(antennas: pl.DataFrame, cell_size: float) -> pl.DataFrame:
+    """Antenna positions (operator, x_lambert93, y_lambert93) with their grid cell cx, cy"""
+    return antennas.select(
+        'operator',
+        pl.col('x_lambert93').cast(pl.Float64),
+        pl.col('y_lambert93').cast(pl.Float64),
+    ).with_columns(
+        (pl.col('x_lambert93') // cell_size).cast(pl.Int64).alias('cx'),
+        (pl.col('y_lambert93') // cell_size).cast(pl.Int64).alias('cy'),
+    )
+
+
+def find_covering_operators_on_grid(
+    points: pl.DataFrame,
+    antennas: pl.DataFrame,
+    cell_size: float,
+    radius: float,
+    operators_by_cell: Optional[pl.DataFrame] = None
+    ) -> pl.DataFrame:
+    """
+    Operators having an antenna within radius of each point, on bucketed antennas.
+
+    A cell lying entirely inside the disk of a point covers it for every
+    operator present in the cell, without looking at single antennas;
+    only the cells crossing the disk border are checked antenna by antenna.
+    Any radius works on any grid, the cell size only changes the number
+    of cells visited per point.
+    Args:
+        points: Polars DataFrame with columns id, x, y (Lambert93)
+        antennas: antennas of one technology, from bucket_antennas
+        cell_size: cell size of the bucketing (in meters)
+        radius: coverage radius (in meters)
+        operators_by_cell: distinct (cx, cy, operator) of the antennas,
+            computed if not given
+    Returns:
+        DataFrame with columns id, operator, one row per covering operator
+    """
+    squared_radius = float(radius) ** 2
+    if operators_by_cell is None:
+        operators_by_cell = antennas.select('cx', 'cy', 'operator').unique()
+
+    x0, x1 = pl.col('cx') * cell_size, (pl.col('cx') + 1) * cell_size
+    y0, y1 = pl.col('cy') * cell_size, (pl.col('cy') + 1) * cell_size
+    cells = (
+        points
+        .select('id', pl.col('x').cast(pl.Float64), pl.col('y').cast(pl.Float64))
+        .with_columns(
+            (pl.col('x') // cell_size).cast(pl.Int64).alias('cx'),
+            (pl.col('y') // cell_size).cast(pl.Int64).alias('cy'),
+        )
+        .join(reachable_offsets(float(cell_size), float(radius)), how='cross')
+        .with_columns(
+            (pl.col('cx') + pl.col('dx')).alias('cx'),
+            (pl.col('cy') + pl.col('dy')).alias('cy'),
+        )
+        .drop('dx', 'dy')
+        .join(operators_by_cell, on=['cx', 'cy'])
+        .with_columns(
+            (pl.max_horizontal(x0 - pl.col('x'), pl.col('x') - x1, pl.lit(0.0)) ** 2
+             + pl.max_horizontal(y0 - pl.col('y'), pl.col('y') - y1, pl.lit(0.0)) ** 2
+             ).alias('min_distance2'),
+            (pl.max_horizontal((pl.col('x') - x0).abs(), (pl.col('x') - x1).abs()) ** 2
+             + pl.max_horizontal((pl.col('y') - y0).abs(), (pl.col('y') - y1).abs()) ** 2
+             ).alias('max_distance2'),
+        )
+    )
+
+    inside = cells.filter(pl.col('max_distance2') <= squared_radius).select('id', 'operator').unique()
+    border = (
+        cells
+        .filter((pl.col('min_distance2') <= squared_radius) & (pl.col('max_distance2') > squared_radius))
+        .join(inside, on=['id', 'operator'], how='anti')
+        .select('id', 'x', 'y', 'cx', 'cy', 'operator')
+        .join(antennas, on=['cx', 'cy', 'operator'])
+        .filter(
+            ((pl.col('x_lambert93') - pl.col('x')) ** 2
+             + (pl.col('y_lambert93') - pl.col('y')) ** 2).sqrt() <= radius
+        )
+        .select('id', 'operator')
+        .unique()
+    )
+    return pl.concat([inside, border]).unique()
@@ -0,0 +1,103 @@
+import polars as pl
+from typing import Tuple
+
+from services.coverage_loader import (
+    CSV_SCHEMA, REJECTION_REASONS, MAX_REJECTED_SAMPLES, row_checks, rejection_code, dataset_columns
+)
+
+# Antennas are matched on these columns by remove and modify rows
+KEY_COLUMNS = ['operator', 'x_lambert93', 'y_lambert93']
+DELTA_ACTIONS = ['add', 'remove', 'modify']
+
+
+class DeltaError(Exception):
+    """Custom exception for invalid delta files."""
+
+
+def load_coverage_delta_from_csv(source) -> pl.DataFrame:
+    """
+    Load a delta file: the coverage CSV columns plus an `action` column.
+
+    `add` rows are new antennas, `remove` rows delete every antenna with the
+    same operator and coordinates, `modify` rows replace them. Rows are
+    checked as at ingestion (see row_checks), except that the 2G/3G/4G
+    columns may be left empty on `remove` rows.
+    Args:
+        source: path or file-like object of the CSV
+    Returns:
+        DataFrame with columns action, operator, x_lambert93, y_lambert93, 2G, 3G, 4G
+
+    Raises:
+        DeltaError: If the file is malformed or has invalid rows.
+    """
+    try:
+        raw = pl.read_csv(source, schema_overrides={**CSV_SCHEMA, 'action': pl.String}, ignore_errors=True)
+        action = pl.col('action').str.strip_chars().str.to_lowercase()
+        checks = row_checks()
+        # Removed antennas are only matched on their key
+        checks[-1] = checks[-1] & (action != 'remove')
+        delta = raw.with_row_index('line', offset=2).select(
+            'line',
+            action.alias('action'),
+            *dataset_columns(),
+            rejection_code(checks).alias('rejection'),
+        )
+    except Exception as e:
+        raise DeltaError(f"Invalid delta file: {e}")
+
+    unknown = delta.filter(~pl.col('action').is_in(DELTA_ACTIONS))
+    if unknown.height:
+        raise DeltaError(f"Unknown actions: {sorted(unknown['action'].drop_nulls().unique().to_list())}")
+
+    rejected = delta.filter(pl.col('rejection').is_not_null())
+    if rejected.height:
+        details = "; ".join(
+            f"line {line}: {REJECTION_REASONS[code]}"
+            for line, code in rejected.select('line', 'rejection').head(MAX_REJECTED_SAMPLES).iter_rows()
+        )
+        raise DeltaError(f"{rejected.height} invalid rows ({details})")
+    return delta.select('action', *KEY_COLUMNS, '2G', '3G', '4G')
+
+
+def apply_coverage_delta(
+    df: pl.DataFrame,
+    delta: pl.DataFrame
+    ) -> Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+    """
+    Apply a delta to the coverage dataset.
+
+    The delta is checked as a whole before anything is applied: a key may
+    appear only once, remove/modify rows must match existing antennas and
+    add rows must not, so that the dataset keeps one row per antenna.
+    Args:
+        df: Polars DataFrame of antennas
+        delta: delta loaded by load_coverage_delta_from_csv
+    Returns:
+        (updated DataFrame, removed antennas, added antennas), the last two
+        having the dataset columns so derived indexes can be patched
+
+    Raises:
+        DeltaError: If the delta does not apply to the dataset.
+    """
+    try:
+        delta = delta.with_columns([pl.col(col).cast(df[col].dtype) for col in KEY_COLUMNS])
+    except Exception as e:
+        raise DeltaError(f"Invalid antenna coordinates: {e}")
+
+    repeated = delta.group_by(KEY_COLUMNS).len().filter(pl.col('len') > 1)
+    if repeated.height:
+        raise DeltaError(f"{repeated.height} antennas appear more than once in the delta")
+
+    existing = delta.filter(pl.col('action') == 'add').join(df, on=KEY_COLUMNS, how='semi')
+    if existing.height:
+        raise DeltaError(f"{existing.height} added antennas already exist, use modify to change them")
+
+    replaced = delta.filter(pl.col('action') != 'add').select(KEY_COLUMNS)
+    missing = replaced.join(df, on=KEY_COLUMNS, how='anti')
+    if missing.height:
+        raise DeltaError(f"{missing.height} removed or modified antennas do not exist")
+
+    removed = df.join(replaced, on=KEY_COLUMNS, how='semi')
+    added = delta.filter(pl.col('action') != 'remove').select(df.columns)
+    updated = pl.concat([df.join(replaced, on=KEY_COLUMNS, how='anti'), added])
+    return updated, removed, added
@@ -1,6 +1,43 @@
 import polars as pl
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 REQUIRED_COLUMNS = ['operator', 'x_lambert93', 'y_lambert93', '2G', '3G', '4G']
+TECH_COLUMNS = ['2G', '3G', '4G']
+# Columns of the source CSV files and the types they are read as
+CSV_SCHEMA = {
+    'Operateur': pl.String,
+    'x': pl.Float64,
+    'y': pl.Float64,
+    '2G': pl.Int8,
+    '3G': pl.Int8,
+    '4G': pl.Int8,
+}
+# Projected bounds (min_x, min_y, max_x, max_y) of Lambert93 (EPSG:2154)
+LAMBERT93_BOUNDS = (-357823.0, 6037008.0, 1313633.0, 7230728.0)
+# Types of the loaded dataset
+DATASET_SCHEMA = {
+    'operator': pl.String,
+    'x_lambert93': pl.Int64,
+    'y_lambert93': pl.Int64,
+    '2G': pl.Boolean,
+    '3G': pl.Boolean,
+    '4G': pl.Boolean,
+}
+# Checks of scan_coverage_measure, in order; a row is rejected for the first it fails
+REJECTION_REASONS = [
+    'missing operator',
+    'invalid coordinates',
+    'coordinates out of bounds',
+    'invalid technology flag',
+]
+# Rejected rows listed in the ingestion report
+MAX_REJECTED_SAMPLES = 20
+
+
+class IngestError(Exception):
+    """Custom exception for malformed coverage files."""
+
 
 def load_coverage_measure_from_csv(path):
     """Load coverage measurement data from a CSV file."""
@@ -18,6 +55,173 @@ def load_coverage_measure_from_csv(path):
         )
     return df
 
+def list_coverage_files(sources) -> List[Path]:
+    """
+    CSV files of one or several sources.
+    Args:
+        sources: path of a CSV file or of a directory of CSV files, or a list of them
+    Returns:
+        list of CSV paths, directories expanded in name order
+
+    Raises:
+        FileNotFoundError: If a source does not exist or no CSV is found.
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    files = []
+    for source in map(Path, sources):
+        if source.is_dir():
+            files.extend(sorted(source.glob("*.csv")))
+        elif source.exists():
+            files.append(source)
+        else:
+            raise FileNotFoundError(f"Coverage source not found: {source}")
+    if not files:
+        raise FileNotFoundError(f"No coverage CSV found in {[str(source) for source in sources]}")
+    return files
+
+def scan_coverage_measure(path) -> pl.LazyFrame:
+    """
+    Lazy scan of one coverage CSV file, renamed, cast and checked row by row.
+
+    Values are cast by the CSV reader itself and unparsable ones are read
+    as null, so that a bad row gets a rejection code instead of failing the
+    whole load; nothing is read before the frame is collected.
+    Args:
+        path: CSV file
+    Returns:
+        LazyFrame with the REQUIRED_COLUMNS plus `rejection`, the index in
+        REJECTION_REASONS of the first check the row fails (null if valid)
+
+    Raises:
+        IngestError: If the file lacks one of the CSV columns.
+    """
+    lazy = pl.scan_csv(path, schema_overrides=CSV_SCHEMA, ignore_errors=True)
+    missing = [col for col in CSV_SCHEMA if col not in lazy.collect_schema()]
+    if missing:
+        raise IngestError(f"{path}: missing columns {missing}")
+
+    return lazy.select(*dataset_columns(), rejection_code(row_checks()).alias('rejection'))
+
+def row_checks() -> List[pl.Expr]:
+    """
+    Checks of a row of the CSV columns (read with CSV_SCHEMA), in the order
+    of REJECTION_REASONS; each is true when the row fails it.
+    """
+    min_x, min_y, max_x, max_y = LAMBERT93_BOUNDS
+    return [
+        pl.col('Operateur').is_null(),
+        pl.col('x').is_null() | pl.col('y').is_null(),
+        ~pl.col('x').is_between(min_x, max_x) | ~pl.col('y').is_between(min_y, max_y),
+        ~pl.all_horizontal([pl.col(col).is_in([0, 1]).fill_null(False) for col in TECH_COLUMNS]),
+    ]
+
+def rejection_code(checks: List[pl.Expr]) -> pl.Expr:
+    """Index of the first failed check, null if the row passes them all"""
+    code = pl.when(checks[0]).then(pl.lit(0, dtype=pl.UInt8))
+    for index, check in enumerate(checks[1:], start=1):
+        code = code.when(check).then(pl.lit(index, dtype=pl.UInt8))
+    return code
+
+def dataset_columns() -> List[pl.Expr]:
+    """The REQUIRED_COLUMNS computed from the CSV columns (read with CSV_SCHEMA)"""
+    return [
+        pl.col('Operateur').alias('operator'),
+        # Lambert93 meters; sub-meter precision is irrelevant to coverage radii
+        pl.col('x').round(0).cast(pl.Int64, strict=False).alias('x_lambert93'),
+        pl.col('y').round(0).cast(pl.Int64, strict=False).alias('y_lambert93'),
+        *[(pl.col(col) == 1).alias(col) for col in TECH_COLUMNS],
+    ]
+
+def merge_duplicate_antennas(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Merge antennas listed several times (same operator and coordinates)
+    into one row having every technology of the duplicates, which leaves
+    the coverage unchanged.
+
+    Repeated keys are found by sorting one hash per row, far lighter than
+    a group by (or hash table) over the whole dataset; only the rows with a
+    repeated hash are then grouped. Unique rows keep their order, merged
+    ones are appended after them.
+    """
+    keys = ['operator', 'x_lambert93', 'y_lambert93']
+    hashes = df.select(pl.struct(keys).hash(seed=0)).to_series()
+    sorted_hashes = hashes.sort()
+    repeated_hashes = sorted_hashes.filter(sorted_hashes == sorted_hashes.shift(1))
+    if repeated_hashes.is_empty():
+        return df
+    repeated = hashes.is_in(repeated_hashes.unique())
+    merged = (
+        df.filter(repeated)
+        .group_by(keys, maintain_order=True)
+        .agg([pl.col(col).max() for col in TECH_COLUMNS])
+    )
+    return pl.concat([df.filter(~repeated), merged])
+
+def ingest_coverage_measure(sources, region: Optional[pl.Expr] = None) -> Tuple[pl.DataFrame, Dict]:
+    """
+    Load and validate coverage CSV files, one file at a time.
+
+    Each file is read with its casts and checks pushed into the scan;
+    valid rows are kept and rejected ones counted with a few samples, so
+    memory holds the accepted rows plus a single file being read. Duplicate
+    antennas are merged at the end (see merge_duplicate_antennas).
+    Args:
+        sources: CSV file, directory or list of them (see list_coverage_files)
+        region: optional filter on the dataset columns (e.g. a bounding
+            box), applied while reading
+    Returns:
+        (DataFrame with the REQUIRED_COLUMNS, report dict {files, rows,
+        accepted, rejected, duplicates, reasons: {reason: count}, samples})
+
+    Raises:
+        FileNotFoundError: If a source is missing.
+        IngestError: If a file lacks one of the CSV columns.
+    """
+    files = list_coverage_files(sources)
+    frames = []
+    rows = 0
+    reasons: Dict[str, int] = {}
+    samples = []
+    for path in files:
+        lazy = scan_coverage_measure(path)
+        if region is not None:
+            lazy = lazy.filter(pl.col('rejection').is_not_null() | region)
+        frame = lazy.collect()
+        rows += frame.height
+
+        rejection = frame['rejection']
+        frame = frame.drop('rejection')
+        if rejection.null_count() == len(rejection):
+            frames.append(frame)
+            continue
+
+        frames.append(frame.filter(rejection.is_null()))
+        for code, count in rejection.drop_nulls().value_counts().iter_rows():
+            reasons[REJECTION_REASONS[code]] = reasons.get(REJECTION_REASONS[code], 0) + count
+        if region is None:
+            # Without filter, frame rows are file rows: data starts on line 2
+            lines = rejection.is_not_null().arg_true().head(MAX_REJECTED_SAMPLES - len(samples))
+            for line in lines.to_list():
+                samples.append({
+                    "source": str(path),
+                    "line": line + 2,
+                    "reason": REJECTION_REASONS[rejection[line]],
+                })
+
+    accepted = pl.concat(frames) if frames else pl.DataFrame(schema=DATASET_SCHEMA)
+    df = merge_duplicate_antennas(accepted)
+    report = {
+        "files": [str(path) for path in files],
+        "rows": rows,
+        "accepted": accepted.height,
+        "rejected": rows - accepted.height,
+        "duplicates": accepted.height - df.height,
+        "reasons": dict(sorted(reasons.items())),
+        "samples": samples,
+    }
+    return df, report
+
 def validate_coverage_measure_dataframe(df):
     """Validate the structure of the coverage measurement DataFrame."""
     for col in REQUIRED_COLUMNS:
@@ -31,4 +235,9 @@ def validate_coverage_measure_dataframe(df):
 
 def get_unique_operators(df):
     """Get a list of unique operators from the DataFrame."""
-    return df['operator'].unique().to_list()
\ No newline at end of file
+    return df['operator'].unique().to_list()
+
+def compute_dataset_version(df):
+    """Content hash of the DataFrame, used to tag caches and ETags."""
+    row_hash = df.hash_rows(seed=0).sum() if len(df) else 0
+    return f"{len(df):x}-{row_hash:016x}"
@@ -0,0 +1,24 @@
+import polars as pl
+
+from services.antenna_tiles import AntennaTiles
+from services.sharding import LocalCoverage
+from services.spatial_index import SpatialIndex
+
+
+class CoverageDataset:
+    """
+    Snapshot of the antennas and of the structures built from them.
+
+    A snapshot is never modified: an update builds a new one and publishes
+    it with a single assignment, so a request reading one snapshot always
+    sees a dataframe, index and tiles of the same version.
+    """
+
+    def __init__(self, df: pl.DataFrame, index: SpatialIndex, tiles: AntennaTiles, version: str):
+        self.df = df
+        self.index = index
+        self.tiles = tiles
+        self.version = version
+        # Shared by every request of the snapshot, so that concurrent
+        # /coverage requests fall into the same micro-batches
+        self.coverage = LocalCoverage(df, index)
@@ -1,9 +1,14 @@
-import aiohttp
-from typing import Optional, List
-import pyproj
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, List, Tuple
 import asyncio
 import logging
 
+# aiohttp and pyproj take a large share of the import time: they are
+# imported on first use (or by the startup warmup) rather than here
+if TYPE_CHECKING:
+    import aiohttp
+    import pyproj
+
 from models import GeocodeResult
 
 logging.basicConfig(level=logging.INFO)
@@ -14,7 +19,7 @@ DEFAULT_TIMEOUT = 10  # seconds
 class GeocodingError(Exception):
     """Custom exception for geocoding errors."""
 
-async def geocode_address(address: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[GeocodeResult]:
+async def geocode_address(address: str, session: Optional["aiohttp.ClientSession"] = None) -> Optional[GeocodeResult]:
     """
     Géocode address with the data.gouv.fr API
 
@@ -28,6 +33,8 @@ async def geocode_address(address: str, session: Optional[aiohttp.ClientSession]
     Raises:
         GeocodingError: If any error occurs during geocoding.
     """
+    import aiohttp
+
     if not address or not address.strip():
         raise GeocodingError("Address is empty or invalid.")
 
@@ -79,12 +86,106 @@ async def geocode_address(address: str, session: Optional[aiohttp.ClientSession]
         if close_session:
             await session.close()
 
+@lru_cache(maxsize=1)
+def _get_lambert93_transformer() -> "pyproj.Transformer":
+    """Build the WGS84 -> Lambert 93 transformer once and reuse it"""
+    import pyproj
+    return pyproj.Transformer.from_crs("EPSG:4326", "EPSG:2154", always_xy=True)
+
 def convert_gps_to_lambert93(lon: float, lat: float) -> tuple:
     """Convert GPS coordinates (lon, lat) to Lambert 93 (x, y)"""
-    transformer = pyproj.Transformer.from_crs("EPSG:4326", "EPSG:2154", always_xy=True)
+    transformer = _get_lambert93_transformer()
     x_lambert93, y_lambert93 = transformer.transform(lon, lat)
     return x_lambert93, y_lambert93
 
+def convert_gps_to_lambert93_batch(lons: List[float], lats: List[float]) -> Tuple[List[float], List[float]]:
+    """Convert many GPS coordinates to Lambert 93 in a single pyproj call"""
+    if not lons:
+        return [], []
+    transformer = _get_lambert93_transformer()
+    xs, ys = transformer.transform(list(lons), list(lats))
+    return list(xs), list(ys)
+
+@lru_cache(maxsize=1)
+def _get_gps_transformer() -> "pyproj.Transformer":
+    """Build the Lambert 93 -> WGS84 transformer once and reuse it"""
+    import pyproj
+    return pyproj.Transformer.from_crs("EPSG:2154", "EPSG:4326", always_xy=True)
+
+def convert_lambert93_to_gps_batch(xs: List[float], ys: List[float]) -> Tuple[List[float], List[float]]:
+    """Convert many Lambert 93 coordinates to GPS (lon, lat) in a single pyproj call"""
+    if not xs:
+        return [], []
+    transformer = _get_gps_transformer()
+    lons, lats = transformer.transform(list(xs), list(ys))
+    return list(lons), list(lats)
+
+async def fetch_commune_contour(
+    code: str,
+    session: Optional["aiohttp.ClientSession"] = None
+) -> List[List[Tuple[float, float]]]:
+    """
+    Fetch the contour of a commune with the geo.api.gouv.fr API
+
+    Args:
+        code: INSEE code of the commune
+        session: Optional aiohttp session
+
+    Returns:
+        The rings of the contour, as lists of (lon, lat)
+
+    Raises:
+        GeocodingError: If any error occurs while fetching the contour.
+    """
+    import aiohttp
+
+    if not code or not code.strip():
+        raise GeocodingError("Commune code is empty or invalid.")
+
+    url = f"https://geo.api.gouv.fr/communes/{code.strip()}"
+    params = {"format": "geojson", "geometry": "contour"}
+
+    close_session = False
+    if session is None:
+        timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+        session = aiohttp.ClientSession(timeout=timeout)
+        close_session = True
+
+    try:
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                raise GeocodingError(f"HTTP error: {response.status}")
+
+            try:
+                data = await response.json()
+            except Exception as e:
+                raise GeocodingError(f"Error parsing JSON: {e}")
+
+            geometry = data.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                raise GeocodingError("No contour found in response.")
+
+            return [
+                [(point[0], point[1]) for point in ring]
+                for polygon in polygons
+                for ring in polygon
+            ]
+    except GeocodingError:
+        raise
+    except asyncio.TimeoutError:
+        raise GeocodingError("Request timed out.")
+    except aiohttp.ClientError as e:
+        raise GeocodingError(f"Client error: {e}")
+    except Exception as e:
+        raise GeocodingError(f"Unexpected error while fetching the contour: {e}")
+    finally:
+        if close_session:
+            await session.close()
+
 async def geocode_addresses(addresses: List[str]) -> List[Optional[GeocodeResult]]:
     """
     Geocode multiple addresses concurrently.
@@ -95,6 +196,8 @@ async def geocode_addresses(addresses: List[str]) -> List[Optional[GeocodeResult
     Returns:
         List of GeocodeResult objects or None for each address
     """
+    import aiohttp
+
     timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
     async with aiohttp.ClientSession(timeout=timeout) as session:
         tasks = [geocode_address(address, session) for address in addresses]
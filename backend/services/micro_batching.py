@@ -0,0 +1,152 @@
+import asyncio
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from services.coverage_calculator import DEFAULT_RADIUS_BY_TECH
+from services.coverage_loader import LAMBERT93_BOUNDS
+
+# Longest time a point waits for other requests to join its batch
+DEFAULT_BATCH_WINDOW_MS = 2.0
+# A batch is evaluated at once when it reaches this many points
+DEFAULT_MAX_BATCH_POINTS = 2000
+
+
+class _PendingBatch:
+    """Points waiting to be evaluated together, with the futures of their requests"""
+
+    def __init__(self):
+        self.points: List[pl.DataFrame] = []
+        self.futures: List[asyncio.Future] = []
+        self.size = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class CoverageBatcher:
+    """
+    Micro-batching of coverage evaluations across concurrent requests.
+
+    Points of requests arriving within `window_ms` of each other, with the
+    same coverage source and radii, are evaluated in one vectorized pass;
+    each request then gets back its own points. A batch is evaluated as
+    soon as it holds `max_batch_points`, so the window bounds the added
+    latency. Evaluation runs in a worker thread while the next batch is
+    collected. A window of 0 evaluates every request on its own.
+
+    One request cannot fail the others of its batch: points that are not
+    finite or lie outside the Lambert93 bounds never join a batch, and if
+    a merged evaluation still fails, each request is evaluated again on
+    its own so that only the faulty one gets the error.
+    """
+
+    def __init__(self, window_ms: float = DEFAULT_BATCH_WINDOW_MS, max_batch_points: int = DEFAULT_MAX_BATCH_POINTS):
+        self.window_ms = window_ms
+        self.max_batch_points = max_batch_points
+        self._pending: Dict[tuple, _PendingBatch] = {}
+        self._running = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def evaluate(self, source, points: pl.DataFrame, radius_by_tech: Optional[dict] = None) -> Dict:
+        """
+        Coverage of the points, evaluated with those of concurrent requests.
+        Args:
+            source: object with a coverage_for_points(points, radius_by_tech) method
+            points: DataFrame with columns id, x, y (Lambert93)
+            radius_by_tech: dict of radius per technology (in meters)
+        Returns:
+            dict {id: {operator: {tech: bool}}}, as source.coverage_for_points;
+            points outside the Lambert93 bounds get an empty dict (no coverage)
+        """
+        if radius_by_tech is None:
+            radius_by_tech = DEFAULT_RADIUS_BY_TECH
+        points, outside = self._split_outside(points)
+        no_coverage = {point_id: {} for point_id in outside}
+        if points.height == 0:
+            return no_coverage
+        if self.window_ms <= 0:
+            self.batches += 1
+            self.requests += 1
+            return {**no_coverage, **await asyncio.to_thread(source.coverage_for_points, points, radius_by_tech)}
+
+        loop = asyncio.get_running_loop()
+        key = (source, tuple(sorted(radius_by_tech.items())))
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch()
+            batch.timer = loop.call_later(self.window_ms / 1000, self._flush, key, batch)
+
+        future = loop.create_future()
+        batch.points.append(points)
+        batch.futures.append(future)
+        batch.size += points.height
+        if batch.size >= self.max_batch_points:
+            self._flush(key, batch)
+        return {**no_coverage, **await future}
+
+    @staticmethod
+    def _split_outside(points: pl.DataFrame) -> Tuple[pl.DataFrame, List[str]]:
+        """Points within the Lambert93 bounds, and the ids of the others (null or not finite included)"""
+        min_x, min_y, max_x, max_y = LAMBERT93_BOUNDS
+        inside = (
+            pl.col('x').cast(pl.Float64).is_between(min_x, max_x)
+            & pl.col('y').cast(pl.Float64).is_between(min_y, max_y)
+        ).fill_null(False)
+        points = points.with_columns(inside.alias('inside'))
+        outside = points.filter(~pl.col('inside'))['id'].cast(pl.Utf8).to_list()
+        return points.filter(pl.col('inside')).drop('inside'), outside
+
+    def _flush(self, key: tuple, batch: _PendingBatch):
+        """Close a pending batch and start its evaluation"""
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        batch.timer.cancel()
+        source, radius_items = key
+        task = asyncio.get_running_loop().create_task(self._run(source, dict(radius_items), batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, source, radius_by_tech: dict, batch: _PendingBatch):
+        """Evaluate a batch and hand each request its own results"""
+        self.batches += 1
+        self.requests += len(batch.futures)
+
+        # Points of different requests may share ids: they are renumbered for the batch
+        ids: List[Tuple[int, list]] = []
+        frames = []
+        offset = 0
+        for points in batch.points:
+            ids.append((offset, points['id'].cast(pl.Utf8).to_list()))
+            frames.append(points.select(
+                pl.int_range(offset, offset + points.height).cast(pl.Utf8).alias('id'),
+                pl.col('x').cast(pl.Float64),
+                pl.col('y').cast(pl.Float64),
+            ))
+            offset += points.height
+
+        try:
+            result = await asyncio.to_thread(source.coverage_for_points, pl.concat(frames), radius_by_tech)
+        except Exception:
+            await self._run_separately(source, radius_by_tech, batch)
+            return
+
+        for future, (offset, point_ids) in zip(batch.futures, ids):
+            if not future.done():
+                future.set_result({
+                    point_id: result[str(offset + i)] for i, point_id in enumerate(point_ids)
+                })
+
+    @staticmethod
+    async def _run_separately(source, radius_by_tech: dict, batch: _PendingBatch):
+        """Evaluate each request of a failed batch on its own, so that only the faulty ones fail"""
+        for points, future in zip(batch.points, batch.futures):
+            if future.done():
+                continue
+            try:
+                result = await asyncio.to_thread(source.coverage_for_points, points, radius_by_tech)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
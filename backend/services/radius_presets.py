@@ -0,0 +1,72 @@
+import threading
+from typing import Dict, Optional
+
+from services.coverage_calculator import TECHNOLOGIES, DEFAULT_RADIUS_BY_TECH
+
+DEFAULT_PRESET = "default"
+# Named profiles kept at most, built-in ones included
+MAX_PRESETS = 64
+# Largest radius accepted, in meters
+MAX_RADIUS = 100000.0
+
+
+class RadiusPresetError(Exception):
+    """Custom exception for unknown or invalid radius presets."""
+
+
+class RadiusPresets:
+    """
+    Named radius profiles (radius per technology, in meters).
+
+    Engineers save the profiles of their what-if scenarios once and then
+    refer to them by name. The built-in `default` profile is read-only.
+    """
+
+    def __init__(self):
+        self._presets: Dict[str, Dict[str, float]] = {DEFAULT_PRESET: dict(DEFAULT_RADIUS_BY_TECH)}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Dict[str, float]:
+        """Radius profile saved under `name`"""
+        try:
+            return dict(self._presets[name])
+        except KeyError:
+            raise RadiusPresetError(f"Unknown radius preset: {name}")
+
+    def all(self) -> Dict[str, Dict[str, float]]:
+        """Every saved profile, by name"""
+        return {name: dict(radius_by_tech) for name, radius_by_tech in self._presets.items()}
+
+    def save(self, name: str, radius_by_tech: Dict[str, float]):
+        """
+        Save a profile under `name`, replacing any previous one.
+
+        Raises:
+            RadiusPresetError: If the name is reserved, the profile incomplete
+                or out of range, or too many profiles are saved.
+        """
+        if name == DEFAULT_PRESET:
+            raise RadiusPresetError(f"The {DEFAULT_PRESET} preset cannot be changed.")
+        if set(radius_by_tech) != set(TECHNOLOGIES):
+            raise RadiusPresetError(f"A preset needs a radius for each of {TECHNOLOGIES}.")
+        if not all(0 < radius <= MAX_RADIUS for radius in radius_by_tech.values()):
+            raise RadiusPresetError(f"Radii must be positive and at most {MAX_RADIUS:.0f} meters.")
+        with self._lock:
+            if name not in self._presets and len(self._presets) >= MAX_PRESETS:
+                raise RadiusPresetError(f"No more than {MAX_PRESETS} presets can be saved.")
+            self._presets[name] = {tech: float(radius_by_tech[tech]) for tech in TECHNOLOGIES}
+
+    def resolve(
+        self,
+        name: Optional[str] = None,
+        overrides: Optional[Dict[str, Optional[float]]] = None
+    ) -> Dict[str, float]:
+        """
+        Radius per technology of a request: a preset (default if None)
+        with some technologies overridden.
+        """
+        radius_by_tech = self.get(name or DEFAULT_PRESET)
+        for tech, radius in (overrides or {}).items():
+            if radius is not None:
+                radius_by_tech[tech] = float(radius)
+        return radius_by_tech
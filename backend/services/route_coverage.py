@@ -0,0 +1,122 @@
+import polars as pl
+from typing import Dict, Optional
+
+from services.coverage_calculator import TECHNOLOGIES, compute_coverage_hits
+
+DEFAULT_SPACING = 100.0  # meters
+MAX_ROUTE_SAMPLES = 200000
+
+class RouteError(Exception):
+    """Custom exception for invalid routes."""
+
+
+def densify_polyline(vertices: pl.DataFrame, spacing: float = DEFAULT_SPACING) -> pl.DataFrame:
+    """
+    Sample a polyline every `spacing` meters.
+
+    Each segment is cut into equal steps no longer than `spacing`, so the
+    vertices themselves are always sampled.
+    Args:
+        vertices: Polars DataFrame with columns x, y (Lambert93), in route order
+        spacing: maximum distance between two samples (in meters)
+    Returns:
+        DataFrame with columns id (sample number), x, y and distance along the route
+
+    Raises:
+        RouteError: If the route has less than 2 vertices or too many samples.
+    """
+    if vertices.height < 2:
+        raise RouteError("A route needs at least 2 points.")
+
+    segments = (
+        vertices.select(pl.col('x').cast(pl.Float64), pl.col('y').cast(pl.Float64))
+        .with_columns(
+            (pl.col('x').shift(-1) - pl.col('x')).alias('dx'),
+            (pl.col('y').shift(-1) - pl.col('y')).alias('dy'),
+        )
+        .head(-1)
+        .with_columns((pl.col('dx') ** 2 + pl.col('dy') ** 2).sqrt().alias('length'))
+        .with_columns(
+            (pl.col('length').cum_sum() - pl.col('length')).alias('offset'),
+            (pl.col('length') / spacing).ceil().cast(pl.Int64).clip(lower_bound=1).alias('steps'),
+        )
+    )
+
+    if segments['steps'].sum() + 1 > MAX_ROUTE_SAMPLES:
+        raise RouteError(f"Route needs more than {MAX_ROUTE_SAMPLES} samples, increase the spacing.")
+
+    samples = (
+        segments
+        .with_columns(pl.int_ranges(0, pl.col('steps')).alias('step'))
+        .explode('step')
+        .with_columns((pl.col('step') / pl.col('steps')).alias('t'))
+        .select(
+            pl.col('x') + pl.col('t') * pl.col('dx'),
+            pl.col('y') + pl.col('t') * pl.col('dy'),
+            pl.col('offset') + pl.col('t') * pl.col('length'),
+        )
+        .rename({'offset': 'distance'})
+    )
+    last = vertices.tail(1).select(
+        pl.col('x').cast(pl.Float64),
+        pl.col('y').cast(pl.Float64),
+        pl.lit(segments['length'].sum(), dtype=pl.Float64).alias('distance'),
+    )
+    return pl.concat([samples, last]).with_row_index('id')
+
+
+def compute_route_coverage(
+    vertices: pl.DataFrame,
+    df: pl.DataFrame,
+    spacing: float = DEFAULT_SPACING,
+    radius_by_tech: Optional[dict[str, float]] = None,
+    index=None
+    ) -> Dict:
+    """
+    Coverage along a polyline, as merged intervals per operator and technology.
+
+    Every sample is evaluated in one batch; consecutive samples with the same
+    coverage are merged. An interval starts at its first sample and ends at
+    the first sample of the next interval (or at the end of the route).
+    Args:
+        vertices: Polars DataFrame with columns x, y (Lambert93), in route order
+        df: Polars DataFrame of antennas
+        spacing: maximum distance between two samples (in meters)
+        radius_by_tech: dict of radius per technology (in meters)
+        index: optional SpatialIndex over df, whose cached grids avoid
+            bucketing the antennas on every call
+    Returns:
+        dict {length, samples, coverage: {operator: {tech: [{start, end, covered}]}}}
+    """
+    samples = densify_polyline(vertices, spacing)
+    length = samples['distance'][-1]
+
+    if index is not None:
+        hits = index.coverage_hits(samples.select('id', 'x', 'y'), radius_by_tech)
+    else:
+        hits = compute_coverage_hits(samples.select('id', 'x', 'y'), df, radius_by_tech)
+    groups = pl.DataFrame({'operator': df['operator'].unique()}).join(
+        pl.DataFrame({'tech': TECHNOLOGIES}), how='cross'
+    )
+
+    intervals = (
+        samples.select('id', 'distance')
+        .join(groups, how='cross')
+        .join(hits.with_columns(pl.lit(True).alias('covered')), on=['id', 'operator', 'tech'], how='left')
+        .with_columns(pl.col('covered').fill_null(False))
+        .sort('operator', 'tech', 'id')
+        .with_columns(pl.col('covered').rle_id().over('operator', 'tech').alias('run'))
+        .group_by('operator', 'tech', 'run', maintain_order=True)
+        .agg(pl.col('distance').first().alias('start'), pl.col('covered').first())
+        .with_columns(pl.col('start').shift(-1).over('operator', 'tech').fill_null(length).alias('end'))
+    )
+
+    coverage: Dict[str, Dict[str, list]] = {}
+    for op, tech, start, end, covered in intervals.select('operator', 'tech', 'start', 'end', 'covered').iter_rows():
+        coverage.setdefault(op, {}).setdefault(tech, []).append({
+            "start": start,
+            "end": end,
+            "covered": covered,
+        })
+
+    return {"length": length, "samples": samples.height, "coverage": coverage}
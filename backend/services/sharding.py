@@ -0,0 +1,313 @@
+import itertools
+import multiprocessing
+import threading
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from services.coverage_calculator import (
+    TECHNOLOGIES, DEFAULT_RADIUS_BY_TECH, compute_coverage_for_point, compute_coverage_for_points
+)
+from services.coverage_loader import ingest_coverage_measure, list_coverage_files, scan_coverage_measure
+from services.spatial_index import SpatialIndex
+
+DEFAULT_SHARD_SIZE = 100000.0  # meters
+# Antennas this close to a shard are copied into it, so that points using
+# radii up to the halo are answered by the shard owning them alone
+DEFAULT_HALO = float(max(DEFAULT_RADIUS_BY_TECH.values()))
+# Seconds allowed for a worker to load its shard
+WORKER_START_TIMEOUT = 120
+
+Tile = Tuple[int, int]
+
+
+class ShardError(Exception):
+    """Custom exception for shard worker failures."""
+
+
+def _tile_filter(tiles: List[Tile], shard_size: float, halo: float) -> pl.Expr:
+    """Antennas within halo of any of the tiles"""
+    condition = pl.lit(False)
+    for tx, ty in tiles:
+        condition = condition | (
+            pl.col('x_lambert93').is_between(tx * shard_size - halo, (tx + 1) * shard_size + halo)
+            & pl.col('y_lambert93').is_between(ty * shard_size - halo, (ty + 1) * shard_size + halo)
+        )
+    return condition
+
+
+def _serve_shard(connection, sources: List[str], tiles: List[Tile], shard_size: float, halo: float):
+    """
+    Worker process: load the antennas of its tiles (plus halo) and answer
+    coverage requests until it receives None. Replies carry the sequence
+    number of their request.
+    """
+    df, _ = ingest_coverage_measure(sources, region=_tile_filter(tiles, shard_size, halo))
+    index = SpatialIndex(df)
+    connection.send(("ready", df.height))
+
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        sequence, points, radius_by_tech = request
+        try:
+            connection.send((sequence, "ok", index.coverage_hits(points, radius_by_tech)))
+        except Exception as e:
+            connection.send((sequence, "error", str(e)))
+    connection.close()
+
+
+def assign_tiles(tile_counts: pl.DataFrame, workers: int) -> List[List[Tile]]:
+    """
+    Split the occupied tiles into contiguous groups of similar antenna counts.
+
+    Tiles are taken in row-major order, so each worker holds one or a few
+    bands of neighbouring tiles and shares few halos with the others.
+    Args:
+        tile_counts: DataFrame with columns tx, ty, count
+        workers: number of groups wanted
+    Returns:
+        list of groups of tiles, at most `workers` of them
+    """
+    tiles = tile_counts.sort('ty', 'tx')
+    total = tiles['count'].sum()
+    groups: List[List[Tile]] = [[]]
+    seen = 0
+    for tx, ty, count in tiles.select('tx', 'ty', 'count').iter_rows():
+        if groups[-1] and seen >= total * len(groups) / workers:
+            groups.append([])
+        groups[-1].append((tx, ty))
+        seen += count
+    return groups
+
+
+class LocalCoverage:
+    """Coverage queries on the dataset loaded in this process"""
+
+    def __init__(self, df: pl.DataFrame, index: SpatialIndex):
+        self.df = df
+        self.index = index
+
+    def coverage_for_point(self, x: float, y: float, radius_by_tech: Optional[dict] = None) -> Dict:
+        return compute_coverage_for_point(x, y, self.df, radius_by_tech)
+
+    def coverage_hits(self, points: pl.DataFrame, radius_by_tech: Optional[dict] = None) -> pl.DataFrame:
+        return self.index.coverage_hits(points, radius_by_tech)
+
+    def coverage_for_points(self, points: pl.DataFrame, radius_by_tech: Optional[dict] = None) -> Dict:
+        return compute_coverage_for_points(points, self.df, radius_by_tech, self.index)
+
+
+class ShardedCoverage:
+    """
+    Coordinator of shard worker processes.
+
+    The Lambert93 plane is cut into square tiles of `shard_size` meters;
+    each worker process holds the antennas of a group of tiles plus a halo
+    around them. A point is sent to the worker owning its tile when the
+    largest radius fits in the halo, otherwise to every worker holding a
+    tile within that radius; the covering operators found are merged.
+    """
+
+    def __init__(
+        self,
+        sources,
+        workers: int = 2,
+        shard_size: float = DEFAULT_SHARD_SIZE,
+        halo: float = DEFAULT_HALO
+    ):
+        self.sources = [str(path) for path in list_coverage_files(sources)]
+        self.shard_size = float(shard_size)
+        self.halo = float(halo)
+
+        lazy = pl.concat([scan_coverage_measure(path) for path in self.sources]).filter(
+            pl.col('rejection').is_null()
+        )
+        tile_counts = (
+            lazy.select(
+                (pl.col('x_lambert93') // self.shard_size).cast(pl.Int64).alias('tx'),
+                (pl.col('y_lambert93') // self.shard_size).cast(pl.Int64).alias('ty'),
+            )
+            .group_by('tx', 'ty').len('count')
+            .collect()
+        )
+        self.operators = sorted(lazy.select(pl.col('operator').unique()).collect()['operator'].to_list())
+        self.groups = assign_tiles(tile_counts, workers) if tile_counts.height else []
+        self.tiles = pl.DataFrame(
+            [(tx, ty, worker) for worker, group in enumerate(self.groups) for tx, ty in group],
+            schema={"tx": pl.Int64, "ty": pl.Int64, "worker": pl.Int64},
+            orient="row",
+        )
+        self._connections = []
+        self._locks: List[threading.Lock] = []
+        self._processes = []
+        self._sequence = itertools.count()
+        # Workers whose pipe broke; their requests fail with a ShardError
+        self.failed = set()
+        self.sizes: List[int] = []
+
+    def start(self):
+        """Spawn the worker processes and wait until each has loaded its shard"""
+        context = multiprocessing.get_context("spawn")
+        for tiles in self.groups:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_serve_shard,
+                args=(child, self.sources, tiles, self.shard_size, self.halo),
+                daemon=True,
+            )
+            process.start()
+            self._connections.append(parent)
+            self._locks.append(threading.Lock())
+            self._processes.append(process)
+
+        for worker, connection in enumerate(self._connections):
+            try:
+                if not connection.poll(WORKER_START_TIMEOUT):
+                    raise ShardError(f"Shard worker {worker} did not start in time.")
+                _, size = connection.recv()
+            except (EOFError, OSError):
+                self.close()
+                raise ShardError(f"Shard worker {worker} stopped while loading its shard.")
+            except ShardError:
+                self.close()
+                raise
+            self.sizes.append(size)
+        return self
+
+    def close(self):
+        """Stop the worker processes"""
+        for connection, process in zip(self._connections, self._processes):
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._connections, self._processes, self._locks = [], [], []
+
+    def route(self, points: pl.DataFrame, radius: float) -> pl.DataFrame:
+        """
+        Workers that can hold an antenna within radius of each point.
+        Returns:
+            DataFrame with columns id, worker
+        """
+        points = points.with_columns(
+            (pl.col('x') // self.shard_size).cast(pl.Int64).alias('tx'),
+            (pl.col('y') // self.shard_size).cast(pl.Int64).alias('ty'),
+        )
+        owned = points.join(self.tiles, on=['tx', 'ty'])
+        if radius <= self.halo:
+            # The owner tile holds every antenna within the halo; points
+            # without owner are in empty areas, reached only by other tiles
+            unowned = points.join(self.tiles, on=['tx', 'ty'], how='anti')
+            owned = owned.select('id', 'worker')
+        else:
+            unowned = points
+            owned = owned.head(0).select('id', 'worker')
+
+        x0, x1 = pl.col('tx_right') * self.shard_size, (pl.col('tx_right') + 1) * self.shard_size
+        y0, y1 = pl.col('ty_right') * self.shard_size, (pl.col('ty_right') + 1) * self.shard_size
+        nearby = (
+            unowned.join(self.tiles, how='cross')
+            .filter(
+                pl.max_horizontal(x0 - pl.col('x'), pl.col('x') - x1, pl.lit(0.0)) ** 2
+                + pl.max_horizontal(y0 - pl.col('y'), pl.col('y') - y1, pl.lit(0.0)) ** 2
+                <= radius ** 2
+            )
+            .select('id', 'worker')
+        )
+        return pl.concat([owned, nearby]).unique()
+
+    def coverage_hits(self, points: pl.DataFrame, radius_by_tech: Optional[dict] = None) -> pl.DataFrame:
+        """
+        Covered (point, operator, technology) triples, scattered to the
+        workers and gathered.
+        Returns:
+            DataFrame with columns id, operator, tech, one row per coverage
+        """
+        if radius_by_tech is None:
+            radius_by_tech = DEFAULT_RADIUS_BY_TECH
+        points = points.select(
+            pl.col('id').cast(pl.Utf8),
+            pl.col('x').cast(pl.Float64),
+            pl.col('y').cast(pl.Float64),
+        )
+        routes = self.route(points, max(radius_by_tech.values()))
+        batches = {
+            worker: points.join(routes.filter(pl.col('worker') == worker), on='id', how='semi')
+            for worker in sorted(routes['worker'].unique().to_list())
+        }
+
+        failed = sorted(self.failed.intersection(batches))
+        if failed:
+            raise ShardError(f"Shard workers {failed} are not running.")
+
+        # Scatter to every worker before gathering, so that they run in parallel;
+        # locks are taken in worker order by every request to avoid deadlocks
+        sequence = next(self._sequence)
+        sent, replies = [], {}
+        for worker in batches:
+            self._locks[worker].acquire()
+        try:
+            for worker, batch in batches.items():
+                try:
+                    self._connections[worker].send((sequence, batch, radius_by_tech))
+                except (BrokenPipeError, EOFError, OSError):
+                    self.failed.add(worker)
+                    raise ShardError(f"Shard worker {worker} stopped.")
+                sent.append(worker)
+            for worker in sent:
+                replies[worker] = self._receive(worker, sequence)
+        finally:
+            # After an error, read the replies still pending so that the next
+            # request on these pipes does not take them for its own
+            for worker in sent:
+                if worker not in replies and worker not in self.failed:
+                    try:
+                        self._receive(worker, sequence)
+                    except ShardError:
+                        pass
+            for worker in batches:
+                self._locks[worker].release()
+
+        frames = []
+        for status, result in replies.values():
+            if status != "ok":
+                raise ShardError(f"Shard worker failed: {result}")
+            frames.append(result)
+        if not frames:
+            return pl.DataFrame(schema={"id": pl.Utf8, "operator": pl.Utf8, "tech": pl.Utf8})
+        return pl.concat(frames).unique()
+
+    def _receive(self, worker: int, sequence: int) -> tuple:
+        """
+        Reply of a worker to the request `sequence`, skipping stale replies
+        to earlier requests. The worker lock must be held.
+        Returns:
+            (status, result)
+        """
+        while True:
+            try:
+                reply_sequence, status, result = self._connections[worker].recv()
+            except (EOFError, OSError):
+                self.failed.add(worker)
+                raise ShardError(f"Shard worker {worker} stopped.")
+            if reply_sequence == sequence:
+                return status, result
+
+    def coverage_for_points(self, points: pl.DataFrame, radius_by_tech: Optional[dict] = None) -> Dict:
+        """dict {id: {operator: {tech: bool}}}, same as compute_coverage_for_points"""
+        result = {
+            point_id: {op: {tech: False for tech in TECHNOLOGIES} for op in self.operators}
+            for point_id in points['id'].cast(pl.Utf8).to_list()
+        }
+        for point_id, op, tech in self.coverage_hits(points, radius_by_tech).iter_rows():
+            result[point_id][op][tech] = True
+        return result
+
+    def coverage_for_point(self, x: float, y: float, radius_by_tech: Optional[dict] = None) -> Dict:
+        """dict {operator: {tech: bool}}, same as compute_coverage_for_point"""
+        point = pl.DataFrame({"id": ["point"], "x": [float(x)], "y": [float(y)]})
+        return self.coverage_for_points(point, radius_by_tech)["point"]
@@ -0,0 +1,500 @@
+import copy
+import math
+import polars as pl
+from typing import Dict, List, Optional, Tuple
+
+from services.coverage_calculator import (
+    TECHNOLOGIES, DEFAULT_RADIUS_BY_TECH, CELL_SUBDIVISIONS,
+    bucket_antennas, find_covering_operators_on_grid
+)
+
+DEFAULT_CELL_SIZE = 5000.0  # meters
+# Beyond this ring count the remaining searches switch to cell pruning
+MAX_SEARCH_RINGS = 2
+# Pyramid of cell counts used for pruning, in grid cells per side (coarse to fine)
+PYRAMID_FACTORS = (64, 16, 4, 1)
+# Smallest cell of the coverage grids, the larger ones grow by a factor sqrt(2)
+COVERAGE_GRID_BASE = 250.0  # meters
+
+
+def _square_offsets(rings: int) -> pl.DataFrame:
+    """All (dx, dy) cell offsets of the square of half-width `rings`"""
+    span = range(-rings, rings + 1)
+    return pl.DataFrame({
+        "dx": [dx for dx in span for _ in span],
+        "dy": [dy for _ in span for dy in span],
+    }, schema={"dx": pl.Int64, "dy": pl.Int64})
+
+
+def _prune_cells(cells: pl.DataFrame, size: float, k: int) -> pl.DataFrame:
+    """
+    Keep the cells that may hold one of the k nearest antennas of a search.
+
+    Cells are ranked by their farthest corner until they hold k antennas
+    (or all antennas of the group); that corner distance bounds the k-th
+    nearest antenna, so cells whose nearest edge is beyond it are dropped.
+    Args:
+        cells: one row per (search, cell) with the search number, x, y,
+            the cell coordinates lx, ly, count (antennas in the cell) and
+            len (antennas in the group)
+        size: cell size in meters
+    """
+    x0, x1 = pl.col('lx') * size, (pl.col('lx') + 1) * size
+    y0, y1 = pl.col('ly') * size, (pl.col('ly') + 1) * size
+    cells = cells.with_columns(
+        (pl.max_horizontal(x0 - pl.col('x'), pl.col('x') - x1, pl.lit(0.0)) ** 2
+         + pl.max_horizontal(y0 - pl.col('y'), pl.col('y') - y1, pl.lit(0.0)) ** 2
+         ).sqrt().alias('min_distance'),
+        (pl.max_horizontal((pl.col('x') - x0).abs(), (pl.col('x') - x1).abs()) ** 2
+         + pl.max_horizontal((pl.col('y') - y0).abs(), (pl.col('y') - y1).abs()) ** 2
+         ).sqrt().alias('max_distance'),
+    )
+    bounds = (
+        cells.sort('search', 'max_distance')
+        .with_columns(pl.col('count').cum_sum().over('search').alias('cumulative'))
+        .filter(pl.col('cumulative') >= pl.min_horizontal(pl.lit(k), pl.col('len')))
+        .group_by('search')
+        .agg(pl.col('max_distance').min().alias('bound'))
+    )
+    return (
+        cells.join(bounds, on='search')
+        .filter(pl.col('min_distance') <= pl.col('bound'))
+        .drop('min_distance', 'max_distance', 'bound', 'count')
+    )
+
+
+def _cell_key(x: str = 'cx', y: str = 'cy') -> pl.Expr:
+    """Int64 key of the cell (x, y), ordered like sort(x, y)"""
+    return (pl.col(x).cast(pl.Int64) * 2 ** 32 + pl.col(y) + 2 ** 31).alias('cell')
+
+
+def _cell_keys(rows: pl.DataFrame, x: str = 'cx', y: str = 'cy') -> pl.Series:
+    """Cell keys of the rows"""
+    return rows.select(_cell_key(x, y)).to_series()
+
+
+def _cell_ranges(keys: pl.Series, cells: pl.Series) -> Tuple[List[int], List[int]]:
+    """Row range [start, end) of each cell in sorted cell keys"""
+    ranges = keys.to_frame('cell').select(
+        pl.col('cell').search_sorted(cells, 'left').alias('start'),
+        pl.col('cell').search_sorted(cells, 'right').alias('end'),
+    )
+    return ranges['start'].to_list(), ranges['end'].to_list()
+
+
+def _cell_rows(rows: pl.DataFrame, keys: pl.Series, cells: pl.Series) -> pl.DataFrame:
+    """Rows of some cells, read from their row ranges in rows sorted by cell"""
+    starts, ends = _cell_ranges(keys, cells)
+    return pl.concat([rows.slice(start, end - start) for start, end in zip(starts, ends)])
+
+
+def _replace_cells(
+    rows: pl.DataFrame,
+    keys: pl.Series,
+    cells: pl.Series,
+    replacement: pl.DataFrame,
+    x: str = 'cx',
+    y: str = 'cy'
+    ) -> pl.DataFrame:
+    """
+    Rows sorted by cell, with the rows of some cells replaced.
+
+    Only the row ranges of the replaced cells change; the rows between
+    them are copied over in order, so nothing is re-sorted or joined.
+    Args:
+        rows: rows sorted by _cell_key(x, y)
+        keys: cell keys of rows
+        cells: sorted distinct keys of the cells to replace
+        replacement: new rows of those cells, in any order
+    """
+    replacement = replacement.with_columns(_cell_key(x, y)).sort('cell')
+    starts, ends = _cell_ranges(keys, cells)
+    new_starts, new_ends = _cell_ranges(replacement['cell'], cells)
+
+    # Row ranges of the result, in rows followed by replacement
+    offset = rows.height
+    range_starts, range_ends = [], []
+    previous = 0
+    for start, end, new_start, new_end in zip(starts, ends, new_starts, new_ends):
+        range_starts += [previous, offset + new_start]
+        range_ends += [start, offset + new_end]
+        previous = end
+    range_starts.append(previous)
+    range_ends.append(offset)
+
+    ranges = pl.DataFrame({'start': range_starts, 'end': range_ends}).filter(pl.col('end') > pl.col('start'))
+    order = ranges.select(pl.int_ranges('start', 'end').explode()).to_series()
+    return pl.concat([rows, replacement.drop('cell')]).select(pl.all().gather(order))
+
+
+def _changed_cells(*frames: pl.DataFrame, x: str = 'cx', y: str = 'cy') -> pl.Series:
+    """Sorted distinct cell keys of the rows of the frames"""
+    return pl.concat([_cell_keys(frame, x, y) for frame in frames]).unique().sort()
+
+
+def _apply_count_changes(
+    counts: pl.DataFrame,
+    changes: pl.DataFrame,
+    keys: List[str],
+    column: str
+    ) -> pl.DataFrame:
+    """Add signed changes to the counts of the matching keys, dropping empty ones"""
+    return (
+        counts.select(*keys, column)
+        .join(changes, on=keys, how='full', coalesce=True)
+        .with_columns(
+            (pl.col(column).fill_null(0).cast(pl.Int64) + pl.col('change').fill_null(0)).alias(column)
+        )
+        .filter(pl.col(column) > 0)
+        .with_columns(pl.col(column).cast(pl.UInt32))
+        .drop('change')
+    )
+
+
+class SpatialIndex:
+    """
+    Uniform grid index over the antennas.
+
+    Antennas are stored in long format, one row per (antenna, technology),
+    and bucketed on Lambert93 cells of `cell_size` meters. Queries only
+    visit the cells around each point, so their cost depends on the local
+    antenna density rather than on the dataset size.
+    """
+
+    def __init__(self, df: pl.DataFrame, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.antennas = self._bucket(df)
+        self._build_counts()
+        self._cell_keys = _cell_keys(self.antennas)
+        self._coverage_grids: Dict[Tuple[str, float], Tuple[pl.DataFrame, pl.DataFrame]] = {}
+
+    def _bucket(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Explode antennas per technology and assign their grid cell"""
+        frames = [
+            df.filter(pl.col(tech)).select(
+                'operator',
+                pl.lit(tech).alias('tech'),
+                pl.col('x_lambert93').cast(pl.Float64),
+                pl.col('y_lambert93').cast(pl.Float64),
+            )
+            for tech in TECHNOLOGIES
+        ]
+        return (
+            pl.concat(frames)
+            .with_columns(
+                (pl.col('x_lambert93') // self.cell_size).cast(pl.Int64).alias('cx'),
+                (pl.col('y_lambert93') // self.cell_size).cast(pl.Int64).alias('cy'),
+            )
+            .sort('cx', 'cy')
+        )
+
+    def _build_counts(self):
+        """
+        Antenna counts per (operator, tech) and per cell of each pyramid
+        level; the levels below the top one are sorted by cell, so that a
+        delta only rewrites its cells
+        """
+        self.group_sizes = self.antennas.group_by('operator', 'tech').len()
+        self.pyramid = []
+        for level, factor in enumerate(PYRAMID_FACTORS):
+            counts = self.antennas.group_by(
+                'operator', 'tech',
+                (pl.col('cx') // factor).alias('lx'),
+                (pl.col('cy') // factor).alias('ly'),
+            ).len('count').sort('lx', 'ly')
+            self.pyramid.append((factor, self._link_level(level, counts)))
+
+    def _link_level(self, level: int, counts: pl.DataFrame) -> pl.DataFrame:
+        """Add the group size to the counts of the top level, and the parent cell to the others"""
+        counts = counts.select('operator', 'tech', 'lx', 'ly', 'count')
+        if level == 0:
+            return counts.join(self.group_sizes, on=['operator', 'tech'])
+        ratio = PYRAMID_FACTORS[level - 1] // PYRAMID_FACTORS[level]
+        return counts.with_columns(
+            (pl.col('lx') // ratio).alias('px'),
+            (pl.col('ly') // ratio).alias('py'),
+        )
+
+    def with_delta(self, removed: pl.DataFrame, added: pl.DataFrame) -> "SpatialIndex":
+        """
+        Copy of the index with antennas removed and added.
+
+        The antenna table, the pyramid counts and the cached coverage grids
+        are all kept sorted by cell: only the row ranges of the cells
+        holding a changed antenna are rewritten, the rest is reused as
+        slices. The index itself is left untouched for the queries still
+        running on it.
+        Args:
+            removed: antennas to remove (dataset columns)
+            added: antennas to add (dataset columns)
+        """
+        removed = self._bucket(removed)
+        added = self._bucket(added)
+        index = copy.copy(self)
+        if removed.height == 0 and added.height == 0:
+            return index
+        changes = pl.concat([
+            removed.with_columns(pl.lit(-1).alias('change')),
+            added.with_columns(pl.lit(1).alias('change')),
+        ])
+
+        cells = _changed_cells(removed, added)
+        current = _cell_rows(self.antennas, self._cell_keys, cells)
+        index.antennas = _replace_cells(self.antennas, self._cell_keys, cells, pl.concat([
+            current.join(removed, on=list(removed.columns), how='anti'),
+            added,
+        ]))
+        index._cell_keys = _cell_keys(index.antennas)
+        # Copied first: queries may add grids to the cache meanwhile
+        index._coverage_grids = {
+            (tech, cell_size): self._patch_coverage_grid(grid, tech, cell_size, removed, added)
+            for (tech, cell_size), grid in dict(self._coverage_grids).items()
+        }
+
+        index.group_sizes = _apply_count_changes(
+            self.group_sizes, changes.group_by('operator', 'tech').agg(pl.col('change').sum()),
+            ['operator', 'tech'], 'len'
+        )
+        index.pyramid = []
+        for level, (factor, counts) in enumerate(self.pyramid):
+            cell_changes = changes.group_by(
+                'operator', 'tech',
+                (pl.col('cx') // factor).alias('lx'),
+                (pl.col('cy') // factor).alias('ly'),
+            ).agg(pl.col('change').sum())
+            keys = ['operator', 'tech', 'lx', 'ly']
+            if level == 0:
+                # A few hundred rows, whose group sizes may all change
+                counts = index._link_level(level, _apply_count_changes(counts, cell_changes, keys, 'count'))
+            else:
+                level_cells = _changed_cells(cell_changes, x='lx', y='ly')
+                counts_keys = _cell_keys(counts, 'lx', 'ly')
+                current = _cell_rows(counts, counts_keys, level_cells)
+                counts = _replace_cells(
+                    counts, counts_keys, level_cells,
+                    index._link_level(level, _apply_count_changes(current, cell_changes, keys, 'count')),
+                    'lx', 'ly'
+                )
+            index.pyramid.append((factor, counts))
+        return index
+
+    @staticmethod
+    def _patch_coverage_grid(
+        grid: Tuple[pl.DataFrame, pl.DataFrame],
+        tech: str,
+        cell_size: float,
+        removed: pl.DataFrame,
+        added: pl.DataFrame
+    ) -> Tuple[pl.DataFrame, pl.DataFrame]:
+        """
+        Cached coverage grid with antennas removed and added; only the rows
+        of the cells holding a changed antenna are rewritten.
+        Args:
+            grid: (bucketed antennas, distinct (cx, cy, operator)) of coverage_grid, sorted by cell
+            removed, added: changed antennas, bucketed by _bucket
+        """
+        antennas, operators_by_cell = grid
+        removed = bucket_antennas(removed.filter(pl.col('tech') == tech), cell_size)
+        added = bucket_antennas(added.filter(pl.col('tech') == tech), cell_size)
+        if removed.height == 0 and added.height == 0:
+            return grid
+
+        cells = _changed_cells(removed, added)
+        keys = _cell_keys(antennas)
+        current = _cell_rows(antennas, keys, cells)
+        replacement = pl.concat([
+            current.join(removed, on=['operator', 'x_lambert93', 'y_lambert93'], how='anti'),
+            added,
+        ])
+        return (
+            _replace_cells(antennas, keys, cells, replacement),
+            _replace_cells(
+                operators_by_cell, _cell_keys(operators_by_cell), cells,
+                replacement.select('cx', 'cy', 'operator').unique()
+            ),
+        )
+
+    def coverage_grid(self, tech: str, radius: float) -> Tuple[float, pl.DataFrame, pl.DataFrame]:
+        """
+        Antennas of a technology bucketed on a grid suited to the radius.
+
+        Grid cells are COVERAGE_GRID_BASE times a power of sqrt(2), the
+        smallest not below radius / CELL_SUBDIVISIONS: queries are fastest
+        with cells of 0.5 to 0.7 radius, and every radius maps to one of a
+        few grids, each built once and cached.
+        Returns:
+            (cell size, bucketed antennas, distinct (cx, cy, operator))
+        """
+        ratio = max(radius / CELL_SUBDIVISIONS / COVERAGE_GRID_BASE, 1.0)
+        cell_size = COVERAGE_GRID_BASE * 2 ** (math.ceil(2 * math.log2(ratio)) / 2)
+        key = (tech, cell_size)
+        if key not in self._coverage_grids:
+            # Sorted by cell, for with_delta
+            antennas = bucket_antennas(self.antennas.filter(pl.col('tech') == tech), cell_size).sort('cx', 'cy')
+            operators_by_cell = antennas.select('cx', 'cy', 'operator').unique(maintain_order=True)
+            self._coverage_grids[key] = (antennas, operators_by_cell)
+        return (cell_size, *self._coverage_grids[key])
+
+    def coverage_hits(
+        self,
+        points: pl.DataFrame,
+        radius_by_tech: Optional[dict[str, float]] = None
+    ) -> pl.DataFrame:
+        """
+        Covered (point, operator, technology) triples, for any radii.
+        Args:
+            points: DataFrame with columns id, x, y (Lambert93)
+            radius_by_tech: dict of radius per technology (in meters)
+        Returns:
+            DataFrame with columns id, operator, tech, one row per coverage
+        """
+        if radius_by_tech is None:
+            radius_by_tech = DEFAULT_RADIUS_BY_TECH
+
+        frames = []
+        for tech in TECHNOLOGIES:
+            cell_size, antennas, operators_by_cell = self.coverage_grid(tech, radius_by_tech[tech])
+            frames.append(
+                find_covering_operators_on_grid(points, antennas, cell_size, radius_by_tech[tech], operators_by_cell)
+                .with_columns(pl.lit(tech).alias('tech'))
+            )
+        return pl.concat(frames)
+
+    def antennas_in_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> pl.DataFrame:
+        """
+        Antennas (one row per technology) inside a Lambert93 box.
+        The grid columns overlapping the box are a contiguous row range.
+        """
+        # First cell of the first column and last cell of the last column
+        bounds = _cell_keys(pl.DataFrame({
+            'cx': [int(min_x // self.cell_size), int(max_x // self.cell_size)],
+            'cy': [-2 ** 31, 2 ** 31 - 1],
+        }))
+        starts, ends = _cell_ranges(self._cell_keys, bounds)
+        start, end = starts[0], ends[1]
+        return self.antennas.slice(start, end - start).filter(
+            pl.col('x_lambert93').is_between(min_x, max_x)
+            & pl.col('y_lambert93').is_between(min_y, max_y)
+        )
+
+    def _with_cells(self, points: pl.DataFrame) -> pl.DataFrame:
+        """Normalize points (id, x, y) and add their grid cell"""
+        return points.select(
+            pl.col('id').cast(pl.Utf8),
+            pl.col('x').cast(pl.Float64),
+            pl.col('y').cast(pl.Float64),
+        ).with_columns(
+            (pl.col('x') // self.cell_size).cast(pl.Int64).alias('cx'),
+            (pl.col('y') // self.cell_size).cast(pl.Int64).alias('cy'),
+        )
+
+    def _candidates(self, pending: pl.DataFrame, rings: int) -> pl.DataFrame:
+        """Antennas of each pending (point, operator, tech) in the square of `rings` cells"""
+        return (
+            pending
+            .join(_square_offsets(rings), how='cross')
+            .with_columns(
+                (pl.col('cx') + pl.col('dx')).alias('cx'),
+                (pl.col('cy') + pl.col('dy')).alias('cy'),
+            )
+            .drop('dx', 'dy')
+            .join(self.antennas, on=['operator', 'tech', 'cx', 'cy'])
+            .pipe(self._with_distance)
+        )
+
+    def _pruned_scan(self, pending: pl.DataFrame, k: int) -> pl.DataFrame:
+        """
+        Exact search for sparse areas using per-cell antenna counts.
+
+        Cells are pruned level by level down the count pyramid, and only
+        the antennas of the surviving grid cells are scanned.
+        """
+        keys = ['id', 'operator', 'tech']
+        searches = pending.select(*keys, 'x', 'y').with_row_index('search')
+
+        cells = None
+        for factor, counts in self.pyramid:
+            if cells is None:
+                cells = searches.join(counts, on=['operator', 'tech'])
+            else:
+                cells = (
+                    cells.rename({'lx': 'px', 'ly': 'py'})
+                    .join(counts, on=['operator', 'tech', 'px', 'py'])
+                    .drop('px', 'py')
+                )
+            cells = _prune_cells(cells, self.cell_size * factor, k)
+
+        return (
+            cells.select(*keys, 'x', 'y', pl.col('lx').alias('cx'), pl.col('ly').alias('cy'))
+            .join(self.antennas, on=['operator', 'tech', 'cx', 'cy'])
+            .pipe(self._with_distance)
+        )
+
+    @staticmethod
+    def _with_distance(pairs: pl.DataFrame) -> pl.DataFrame:
+        return pairs.with_columns(
+            ((pl.col('x_lambert93') - pl.col('x')) ** 2
+             + (pl.col('y_lambert93') - pl.col('y')) ** 2).sqrt().alias('distance')
+        ).select('id', 'operator', 'tech', 'x_lambert93', 'y_lambert93', 'distance')
+
+    @staticmethod
+    def _top_k(pairs: pl.DataFrame, k: int) -> pl.DataFrame:
+        """Keep the k closest antennas per (point, operator, tech)"""
+        return pairs.filter(pl.col('distance').rank('ordinal').over('id', 'operator', 'tech') <= k)
+
+    def nearest(self, points: pl.DataFrame, k: int = 3) -> pl.DataFrame:
+        """
+        k nearest antennas per operator and technology for each point.
+
+        Each search first scans the square of 1 then MAX_SEARCH_RINGS cells
+        around its point, and is exact as soon as its k-th candidate is
+        closer than the square's inner border. Searches still unresolved
+        (sparse areas) go through the pruned scan of the count pyramid.
+        Args:
+            points: DataFrame with columns id, x, y (Lambert93)
+            k: number of antennas to return per operator and technology
+        Returns:
+            DataFrame with id, operator, tech, x_lambert93, y_lambert93 and
+            distance, sorted by distance within each group
+        """
+        keys = ['id', 'operator', 'tech']
+        group_sizes = self.group_sizes
+        # One pending search per (point, operator, tech)
+        pending = self._with_cells(points).join(group_sizes, how='cross')
+        found: List[pl.DataFrame] = []
+        rings = 1
+
+        while pending.height and rings <= MAX_SEARCH_RINGS:
+            top = self._top_k(self._candidates(pending, rings), k)
+            # A search is resolved once it holds k antennas (or all that exist)
+            # and none of them lies beyond the searched radius
+            resolved = (
+                top.group_by(keys)
+                .agg(pl.len().alias('found'), pl.col('distance').max().alias('kth'))
+                .join(group_sizes, on=['operator', 'tech'])
+                .filter(
+                    (pl.col('found') >= pl.min_horizontal(pl.lit(k), pl.col('len')))
+                    & (pl.col('kth') <= rings * self.cell_size)
+                )
+                .select(keys)
+            )
+            found.append(top.join(resolved, on=keys))
+            pending = pending.join(resolved, on=keys, how='anti')
+            rings *= 2
+
+        if pending.height or not found:
+            found.append(self._top_k(self._pruned_scan(pending, k), k))
+
+        return pl.concat(found).sort('id', 'operator', 'tech', 'distance')
+
+
+def nearest_to_dict(nearest: pl.DataFrame) -> Dict[str, Dict[str, Dict[str, list]]]:
+    """Convert SpatialIndex.nearest output to {id: {operator: {tech: [antenna, ...]}}}"""
+    result: Dict[str, Dict[str, Dict[str, list]]] = {}
+    for point_id, op, tech, x, y, distance in nearest.iter_rows():
+        result.setdefault(point_id, {}).setdefault(op, {}).setdefault(tech, []).append({
+            "x_lambert93": x,
+            "y_lambert93": y,
+            "distance": distance,
+        })
+    return result
@@ -0,0 +1,101 @@
+import importlib
+import threading
+import time
+import polars as pl
+from typing import Callable, Dict, Optional
+
+from services.coverage_calculator import DEFAULT_RADIUS_BY_TECH
+from services.geocoding import convert_gps_to_lambert93_batch
+
+# Modules only needed by some requests, imported in the background at startup
+DEFERRED_MODULES = ['aiohttp']
+# Lambert93 points (Paris, Lyon, Marseille) used to warm up the query paths
+WARMUP_POINTS = pl.DataFrame({
+    'id': ['paris', 'lyon', 'marseille'],
+    'x': [652469.0, 842666.0, 892390.0],
+    'y': [6862035.0, 6519924.0, 6247035.0],
+})
+
+
+class StartupProgress:
+    """
+    Status and duration of each startup phase.
+
+    Phases may run concurrently from several threads; the application is
+    ready once every phase has succeeded and mark_ready was called.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, dict] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self.total_ms: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def run(self, name: str, func: Callable, *args):
+        """Run one phase, recording its status and duration"""
+        with self._lock:
+            self.phases[name] = {"status": "running", "duration_ms": None}
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            with self._lock:
+                self.phases[name] = {"status": "failed", "duration_ms": (time.perf_counter() - start) * 1000}
+                self.error = f"{name}: {e}"
+            raise
+        with self._lock:
+            self.phases[name] = {"status": "done", "duration_ms": (time.perf_counter() - start) * 1000}
+        return result
+
+    def fail(self, error: str):
+        """Record an error raised outside of a phase, unless a phase already failed"""
+        with self._lock:
+            if self.error is None:
+                self.error = error
+
+    def mark_ready(self):
+        """End of startup: ready unless a phase failed"""
+        with self._lock:
+            self.ready = self.error is None
+            self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    @property
+    def loading(self) -> bool:
+        """Whether startup is still in progress"""
+        return not self.ready and self.error is None
+
+    def report(self) -> dict:
+        """Readiness, error and per-phase timings"""
+        with self._lock:
+            elapsed_ms = self.total_ms
+            if elapsed_ms is None:
+                elapsed_ms = (time.perf_counter() - self.started) * 1000
+            return {
+                "ready": self.ready,
+                "error": self.error,
+                "elapsed_ms": elapsed_ms,
+                "phases": {name: dict(phase) for name, phase in self.phases.items()},
+            }
+
+
+def import_deferred_modules():
+    """Import the modules left out of the application import"""
+    for module in DEFERRED_MODULES:
+        importlib.import_module(module)
+
+
+def warm_up_projection():
+    """Build the cached WGS84 to Lambert93 transformer used by every request"""
+    convert_gps_to_lambert93_batch([2.3522], [48.8566])
+
+
+def warm_up_queries(coverage_index, antenna_tiles):
+    """
+    Run each query path once so that the first requests do not pay for
+    lazily built structures (coverage grids of the default radii, tiles).
+    """
+    coverage_index.coverage_hits(WARMUP_POINTS, DEFAULT_RADIUS_BY_TECH)
+    coverage_index.nearest(WARMUP_POINTS, k=1)
+    antenna_tiles.tile(0, 0, 0)
@@ -0,0 +1,111 @@
+import pytest
+import polars as pl
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+from services.coverage_loader import load_coverage_measure_from_csv, compute_dataset_version
+from services.antenna_tiles import AntennaTiles, tile_of, tile_bounds
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+class TestAntennaTiles:
+    """Tests for the tiled antenna table"""
+
+    @pytest.fixture
+    def antenna_tiles(self):
+        """Fixture providing the tiled test antennas"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        return AntennaTiles(df, compute_dataset_version(df))
+
+    def test_tile_of_is_inside_tile_bounds(self):
+        """Test that a point lies inside the bounds of its own tile"""
+        lon, lat = 2.2945, 48.8584
+        for z in [0, 5, 12, 20]:
+            min_lon, min_lat, max_lon, max_lat = tile_bounds(z, *tile_of(lon, lat, z))
+            assert min_lon <= lon < max_lon
+            assert min_lat <= lat < max_lat
+
+    def test_world_tile_holds_all_antennas(self, antenna_tiles):
+        """Test that the zoom 0 tile lists every antenna"""
+        tile = antenna_tiles.tile(0, 0, 0)
+
+        assert not tile["clustered"]
+        assert len(tile["antennas"]) == 6
+        assert tile["version"] == antenna_tiles.version
+
+    def test_tile_matches_bounds_filter(self, antenna_tiles):
+        """Test that each tile holds exactly the antennas inside its bounds"""
+        antennas = antenna_tiles.antennas
+        for lon, lat in antennas.select('lon', 'lat').iter_rows():
+            for z in [6, 10, 16]:
+                x, y = tile_of(lon, lat, z)
+                min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+                expected = antennas.filter(
+                    (pl.col('lon') >= min_lon) & (pl.col('lon') < max_lon)
+                    & (pl.col('lat') >= min_lat) & (pl.col('lat') < max_lat)
+                ).height
+                assert len(antenna_tiles.tile(z, x, y)["antennas"]) == expected
+
+    def test_dense_tile_is_clustered(self, antenna_tiles):
+        """Test that tiles above the threshold return clusters"""
+        with patch('services.antenna_tiles.MAX_TILE_ANTENNAS', 2):
+            tile = antenna_tiles._build_tile(0, 0, 0)
+
+        assert tile["clustered"]
+        assert tile["antennas"] == []
+        assert sum(cluster["count"] for cluster in tile["clusters"]) == 6
+
+    def test_bbox(self, antenna_tiles):
+        """Test a bounding box around the first Orange site only"""
+        orange = antenna_tiles.antennas.filter(pl.col('x_lambert93') == 102980.0)
+        lon, lat = orange['lon'][0], orange['lat'][0]
+
+        rows = antenna_tiles.bbox(lon - 0.001, lat - 0.001, lon + 0.001, lat + 0.001)
+        assert rows['operator'].to_list() == ['Orange']
+
+    def test_bbox_limit(self, antenna_tiles):
+        """Test that the bbox result is truncated to the limit"""
+        rows = antenna_tiles.bbox(-10.0, 40.0, 10.0, 52.0, limit=2)
+        assert rows.height == 2
+
+    def test_concurrent_tiles_with_small_cache(self, antenna_tiles):
+        """Test that concurrent lookups and evictions never fail"""
+        keys = [(z, x, y) for z in range(4) for x in range(2 ** z) for y in range(2 ** z)]
+        with patch('services.antenna_tiles.TILE_CACHE_SIZE', 2):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                tiles = list(pool.map(lambda key: antenna_tiles.tile(*key), keys * 20))
+        assert len(tiles) == len(keys) * 20
+        assert len(antenna_tiles._tile_cache) <= 2
+
+    def test_delta_during_tile_requests(self, antenna_tiles):
+        """Test that a delta can copy the cache while other threads fill and evict it"""
+        keys = [(z, x, y) for z in range(4) for x in range(2 ** z) for y in range(2 ** z)]
+        removed = load_coverage_measure_from_csv(TEST_CSV_PATH).filter(pl.col('operator') == 'Free')
+        with patch('services.antenna_tiles.TILE_CACHE_SIZE', 8):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                requests = pool.map(lambda key: antenna_tiles.tile(*key), keys * 50)
+                updates = [antenna_tiles.with_delta(removed, removed.head(0), "next-version") for _ in range(20)]
+                list(requests)
+        assert all(updated.antennas.height == 5 for updated in updates)
+        assert updates[0]._cache_lock is not antenna_tiles._cache_lock
+
+    def test_delta_keeps_untouched_tiles(self, antenna_tiles):
+        """Test that only cached tiles holding a changed antenna are dropped"""
+        free = antenna_tiles.antennas.filter(pl.col('operator') == 'Free')
+        free_tile = tile_of(free['lon'][0], free['lat'][0], 16)
+        orange = antenna_tiles.antennas.filter(pl.col('x_lambert93') == 115635.0)
+        orange_tile = tile_of(orange['lon'][0], orange['lat'][0], 16)
+        antenna_tiles.tile(16, *free_tile)
+        antenna_tiles.tile(16, *orange_tile)
+
+        removed = load_coverage_measure_from_csv(TEST_CSV_PATH).filter(pl.col('operator') == 'Free')
+        updated = antenna_tiles.with_delta(removed, removed.head(0), "next-version")
+
+        assert updated.version == "next-version"
+        assert updated.antennas.height == 5
+        assert updated.tile(16, *free_tile)["antennas"] == []
+        assert updated.tile(16, *free_tile)["version"] == "next-version"
+        # The untouched tile is still served from the cache, with its old version
+        assert updated.tile(16, *orange_tile)["version"] == antenna_tiles.version
+        # The original table is left untouched
+        assert len(antenna_tiles.tile(16, *free_tile)["antennas"]) == 1
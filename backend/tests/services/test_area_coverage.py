@@ -0,0 +1,86 @@
+import pytest
+import polars as pl
+from pathlib import Path
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.coverage_calculator import compute_coverage_for_points
+from services.spatial_index import SpatialIndex
+from services.area_coverage import _edges, polygon_spans, compute_area_coverage, AreaError
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+def span_cell_count(spans: pl.DataFrame) -> int:
+    return (spans['end'] - spans['start']).sum()
+
+class TestPolygonSpans:
+    """Tests for the polygon_spans function"""
+
+    def test_triangle(self):
+        """Test that only cell centers inside the triangle are kept"""
+        triangle = [(0.0, 0.0), (10.0, 0.0), (0.0, 10.0)]
+        spans = polygon_spans(_edges([triangle]), (0.0, 0.0), 1.0, 0, 10)
+
+        assert spans.sort('row')['end'].to_list() == [9 - row for row in range(9)]
+        assert span_cell_count(spans) == 45
+
+    def test_hole(self):
+        """Test that an inner ring is subtracted (even-odd rule)"""
+        outer = [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0)]
+        hole = [(4.0, 4.0), (6.0, 4.0), (6.0, 6.0), (4.0, 6.0)]
+        spans = polygon_spans(_edges([outer, hole]), (0.0, 0.0), 1.0, 0, 10)
+
+        assert span_cell_count(spans) == 96
+        assert spans.filter(pl.col('row') == 5).sort('start').rows() == [(5, 0, 4), (5, 6, 10)]
+
+    def test_degenerate_ring(self):
+        """Test that a ring with less than 3 points is rejected"""
+        with pytest.raises(AreaError):
+            _edges([[(0.0, 0.0), (1.0, 1.0)]])
+
+class TestComputeAreaCoverage:
+    """Tests for the compute_area_coverage function"""
+
+    @pytest.fixture
+    def coverage_df(self):
+        """Fixture providing the test coverage DataFrame"""
+        return load_coverage_measure_from_csv(TEST_CSV_PATH)
+
+    @pytest.fixture
+    def square(self):
+        """40 km square around the first sites"""
+        return [(90000.0, 6830000.0), (130000.0, 6830000.0), (130000.0, 6870000.0), (90000.0, 6870000.0)]
+
+    def test_matches_point_coverage(self, coverage_df, square):
+        """Test that fractions match the coverage of every cell center"""
+        result = compute_area_coverage([square], SpatialIndex(coverage_df), resolution=1000.0)
+        assert result["cells"] == 1600
+        assert result["area"] == pytest.approx(1600 * 1000.0 ** 2)
+
+        centers = pl.DataFrame({
+            "id": [f"{i}_{j}" for i in range(40) for j in range(40)],
+            "x": [90500.0 + 1000.0 * j for _ in range(40) for j in range(40)],
+            "y": [6830500.0 + 1000.0 * i for i in range(40) for _ in range(40)],
+        })
+        points = compute_coverage_for_points(centers, coverage_df)
+        for op, techs in result["coverage"].items():
+            for tech, fraction in techs.items():
+                covered = sum(point[op][tech] for point in points.values())
+                assert fraction == pytest.approx(covered / 1600)
+
+    def test_bands_do_not_change_result(self, coverage_df, square, monkeypatch):
+        """Test that processing rows in smaller bands gives the same fractions"""
+        index = SpatialIndex(coverage_df)
+        expected = compute_area_coverage([square], index, resolution=1000.0)
+        monkeypatch.setattr("services.area_coverage.BAND_ROWS", 3)
+        assert compute_area_coverage([square], index, resolution=1000.0) == expected
+
+    def test_resolution_is_coarsened(self, coverage_df, square, monkeypatch):
+        """Test that the resolution is coarsened above MAX_AREA_CELLS"""
+        monkeypatch.setattr("services.area_coverage.MAX_AREA_CELLS", 400)
+        result = compute_area_coverage([square], SpatialIndex(coverage_df), resolution=100.0)
+        assert result["resolution"] == pytest.approx(2000.0)
+        assert result["cells"] == 400
+
+    def test_no_polygon(self, coverage_df):
+        """Test that an empty zone is rejected"""
+        with pytest.raises(AreaError):
+            compute_area_coverage([], SpatialIndex(coverage_df))
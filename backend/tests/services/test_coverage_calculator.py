@@ -2,7 +2,7 @@ import pytest
 import polars as pl
 from pathlib import Path
 from services.coverage_loader import load_coverage_measure_from_csv
-from services.coverage_calculator import compute_coverage_for_point
+from services.coverage_calculator import compute_coverage_for_point, compute_coverage_for_points
 
 TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
 
@@ -224,4 +224,43 @@ class TestComputeCoverageForPoint:
         # Should have 3G coverage from multiple operators within 5km
         assert result["Orange"]["3G"] is True  # At exact location
         assert result["SFR"]["3G"] is True     # Within 5km
-        assert result["Bouygues"]["3G"] is True # Within 5km
\ No newline at end of file
+        assert result["Bouygues"]["3G"] is True # Within 5km
+
+
+class TestComputeCoverageForPoints:
+    """Tests for the vectorized compute_coverage_for_points function"""
+
+    @pytest.fixture
+    def coverage_df(self):
+        """Fixture providing the test coverage DataFrame"""
+        return load_coverage_measure_from_csv(TEST_CSV_PATH)
+
+    @pytest.fixture
+    def points(self):
+        """Points on, between and far from the test sites"""
+        return pl.DataFrame({
+            'id': ['orange_1', 'between', 'free', 'far'],
+            'x': [102980.0, 103113.5, 129220.0, 999999.0],
+            'y': [6847973.0, 6848662.5, 6848789.0, 999999.0]
+        })
+
+    def test_batch_matches_single_point(self, coverage_df, points):
+        """Test that the batch result equals compute_coverage_for_point for each point"""
+        result = compute_coverage_for_points(points, coverage_df)
+
+        assert list(result.keys()) == points['id'].to_list()
+        for point_id, x, y in points.iter_rows():
+            assert result[point_id] == compute_coverage_for_point(x, y, coverage_df)
+
+    def test_batch_matches_single_point_with_custom_radius(self, coverage_df, points):
+        """Test custom radii give the same result in batch and single mode"""
+        radius = {"2G": 10.0, "3G": 5000.0, "4G": 1.0}
+        result = compute_coverage_for_points(points, coverage_df, radius)
+
+        for point_id, x, y in points.iter_rows():
+            assert result[point_id] == compute_coverage_for_point(x, y, coverage_df, radius)
+
+    def test_batch_empty_points(self, coverage_df):
+        """Test that no points gives an empty result"""
+        empty = pl.DataFrame(schema={'id': pl.Utf8, 'x': pl.Float64, 'y': pl.Float64})
+        assert compute_coverage_for_points(empty, coverage_df) == {}
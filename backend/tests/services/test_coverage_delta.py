@@ -0,0 +1,98 @@
+import io
+import pytest
+import polars as pl
+from pathlib import Path
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.coverage_delta import load_coverage_delta_from_csv, apply_coverage_delta, DeltaError
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+def delta_from_text(text: str) -> pl.DataFrame:
+    return load_coverage_delta_from_csv(io.BytesIO(text.encode()))
+
+class TestLoadCoverageDelta:
+    """Tests for the load_coverage_delta_from_csv function"""
+
+    def test_load_delta(self):
+        """Test that columns are renamed and remove rows may omit technologies"""
+        delta = delta_from_text(
+            "action,Operateur,x,y,2G,3G,4G\n"
+            "remove,Orange,102980,6847973,,,\n"
+            "Add,SFR,100000,6800000,1,0,1\n"
+        )
+        assert delta.columns == ['action', 'operator', 'x_lambert93', 'y_lambert93', '2G', '3G', '4G']
+        assert delta['action'].to_list() == ['remove', 'add']
+        assert delta.row(1)[4:] == (True, False, True)
+
+    def test_unknown_action(self):
+        """Test that an unknown action is rejected"""
+        with pytest.raises(DeltaError):
+            delta_from_text("action,Operateur,x,y,2G,3G,4G\nupsert,SFR,1,2,1,1,1\n")
+
+    def test_add_without_technologies(self):
+        """Test that an added antenna must list its technologies"""
+        with pytest.raises(DeltaError):
+            delta_from_text("action,Operateur,x,y,2G,3G,4G\nadd,SFR,100000,6800000,,,\n")
+
+    @pytest.mark.parametrize("row, reason", [
+        ("add,SFR,100000,6800000,2,0,1", "invalid technology flag"),
+        ("modify,SFR,100000,6800000,1,-1,1", "invalid technology flag"),
+        ("add,SFR,1,2,1,1,1", "coordinates out of bounds"),
+        ("remove,SFR,abc,6800000,,,", "invalid coordinates"),
+        ("add,,100000,6800000,1,1,1", "missing operator"),
+    ])
+    def test_invalid_rows(self, row, reason):
+        """Test that delta rows are checked as at ingestion"""
+        with pytest.raises(DeltaError, match=f"line 3: {reason}"):
+            delta_from_text(f"action,Operateur,x,y,2G,3G,4G\nremove,Orange,102980,6847973,,,\n{row}\n")
+
+class TestApplyCoverageDelta:
+    """Tests for the apply_coverage_delta function"""
+
+    @pytest.fixture
+    def coverage_df(self):
+        """Fixture providing the test coverage DataFrame"""
+        return load_coverage_measure_from_csv(TEST_CSV_PATH)
+
+    def test_apply_delta(self, coverage_df):
+        """Test add, remove and modify rows together"""
+        delta = delta_from_text(
+            "action,Operateur,x,y,2G,3G,4G\n"
+            "remove,Orange,102980,6847973,,,\n"
+            "modify,Free,129220,6848789,1,1,1\n"
+            "add,SFR,100000,6800000,1,0,1\n"
+        )
+        updated, removed, added = apply_coverage_delta(coverage_df, delta)
+
+        assert updated.height == 6
+        assert updated.schema == coverage_df.schema
+        assert removed['operator'].to_list() == ['Orange', 'Free']
+        assert added['operator'].to_list() == ['Free', 'SFR']
+        assert updated.filter(pl.col('operator') == 'Free').row(0)[3:] == (True, True, True)
+        assert updated.filter(pl.col('x_lambert93') == 102980).height == 0
+
+    def test_remove_missing_antenna(self, coverage_df):
+        """Test that removing an unknown antenna rejects the whole delta"""
+        delta = delta_from_text(
+            "action,Operateur,x,y,2G,3G,4G\n"
+            "add,SFR,100000,6800000,1,0,1\n"
+            "remove,SFR,100001,6800001,,,\n"
+        )
+        with pytest.raises(DeltaError):
+            apply_coverage_delta(coverage_df, delta)
+
+    def test_add_existing_antenna(self, coverage_df):
+        """Test that adding an antenna already in the dataset is refused"""
+        delta = delta_from_text("action,Operateur,x,y,2G,3G,4G\nadd,Free,129220,6848789,1,1,1\n")
+        with pytest.raises(DeltaError, match="use modify"):
+            apply_coverage_delta(coverage_df, delta)
+
+    def test_repeated_antenna(self, coverage_df):
+        """Test that an antenna cannot appear twice in a delta"""
+        delta = delta_from_text(
+            "action,Operateur,x,y,2G,3G,4G\n"
+            "remove,Orange,102980,6847973,,,\n"
+            "modify,Orange,102980,6847973,1,1,1\n"
+        )
+        with pytest.raises(DeltaError):
+            apply_coverage_delta(coverage_df, delta)
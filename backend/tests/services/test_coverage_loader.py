@@ -4,7 +4,10 @@ from pathlib import Path
 from services.coverage_loader import (
     load_coverage_measure_from_csv,
     validate_coverage_measure_dataframe,
-    get_unique_operators
+    get_unique_operators,
+    ingest_coverage_measure,
+    merge_duplicate_antennas,
+    IngestError
 )
 # Test data path
 TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
@@ -51,4 +54,83 @@ class TestLoadCoverageMeasure:
         df = load_coverage_measure_from_csv(TEST_CSV_PATH)
         operators = get_unique_operators(df)
         # According to the CSV snippet
-        assert set(operators) == {'Orange', 'Free', 'SFR', 'Bouygues'}
\ No newline at end of file
+        assert set(operators) == {'Orange', 'Free', 'SFR', 'Bouygues'}
+
+
+class TestIngestCoverageMeasure:
+    """Tests for the ingest_coverage_measure function"""
+
+    def test_ingest_matches_eager_load(self):
+        """Test that a clean file loads like load_coverage_measure_from_csv"""
+        df, report = ingest_coverage_measure(TEST_CSV_PATH)
+        assert df.equals(load_coverage_measure_from_csv(TEST_CSV_PATH))
+        assert validate_coverage_measure_dataframe(df) is True
+        assert report["rows"] == 6
+        assert report["rejected"] == 0
+        assert report["duplicates"] == 0
+
+    def test_ingest_directory(self, tmp_path):
+        """Test that every CSV of a directory is loaded"""
+        (tmp_path / "orange.csv").write_text("Operateur,x,y,2G,3G,4G\nOrange,102980,6847973,1,1,0\n")
+        (tmp_path / "free.csv").write_text("Operateur,x,y,2G,3G,4G\nFree,129220,6848789,0,1,1\n")
+        (tmp_path / "notes.txt").write_text("not a CSV")
+        df, report = ingest_coverage_measure(tmp_path)
+        assert report["files"] == [str(tmp_path / "free.csv"), str(tmp_path / "orange.csv")]
+        assert sorted(df['operator'].to_list()) == ["Free", "Orange"]
+
+    def test_ingest_rejects_invalid_rows(self, tmp_path):
+        """Test that invalid rows are reported rather than loaded"""
+        path = tmp_path / "coverage.csv"
+        path.write_text(
+            "Operateur,x,y,2G,3G,4G\n"
+            "Orange,102980,6847973,1,1,0\n"
+            "SFR,abc,6848661,1,1,0\n"
+            ",103114,6848664,1,1,1\n"
+            "Free,129220,9999999,0,1,1\n"
+            "Free,129220,6848789,2,1,1\n"
+        )
+        df, report = ingest_coverage_measure(path)
+        assert df['operator'].to_list() == ["Orange"]
+        assert report["accepted"] == 1
+        assert report["rejected"] == 4
+        assert report["reasons"] == {
+            "coordinates out of bounds": 1,
+            "invalid coordinates": 1,
+            "invalid technology flag": 1,
+            "missing operator": 1,
+        }
+        assert report["samples"][0] == {"source": str(path), "line": 3, "reason": "invalid coordinates"}
+
+    def test_ingest_missing_column(self, tmp_path):
+        """Test that a file without a required column is refused"""
+        path = tmp_path / "coverage.csv"
+        path.write_text("Operateur,x,y,2G,3G\nOrange,102980,6847973,1,1\n")
+        with pytest.raises(IngestError):
+            ingest_coverage_measure(path)
+
+    def test_ingest_missing_source(self):
+        """Test ingesting a source that does not exist"""
+        with pytest.raises(FileNotFoundError):
+            ingest_coverage_measure("directory_that_does_not_exist")
+
+    def test_ingest_region(self):
+        """Test that only the antennas of the region are loaded"""
+        df, _ = ingest_coverage_measure(TEST_CSV_PATH, region=pl.col('x_lambert93') < 110000)
+        assert sorted(df['operator'].to_list()) == ["Bouygues", "Orange", "SFR"]
+
+    def test_merge_duplicate_antennas(self):
+        """Test that antennas listed twice become one row with both technologies"""
+        df = pl.DataFrame({
+            'operator': ['Orange', 'SFR', 'Orange', 'Orange'],
+            'x_lambert93': [1, 1, 1, 2],
+            'y_lambert93': [5, 5, 5, 5],
+            '2G': [True, False, False, False],
+            '3G': [False, False, True, False],
+            '4G': [False, True, False, False],
+        })
+        merged = merge_duplicate_antennas(df)
+        assert merged.rows() == [
+            ('SFR', 1, 5, False, False, True),
+            ('Orange', 2, 5, False, False, False),
+            ('Orange', 1, 5, True, True, False),
+        ]
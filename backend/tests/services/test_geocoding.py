@@ -1,5 +1,5 @@
 import pytest
-from services.geocoding import geocode_address, convert_gps_to_lambert93
+from services.geocoding import geocode_address, convert_gps_to_lambert93, convert_gps_to_lambert93_batch
 
 class TestGeocoding:
     @pytest.mark.asyncio
@@ -38,6 +38,19 @@ class TestGeocoding:
         assert 640000 < x < 660000  # Paris is around 650000 in X
         assert 6850000 < y < 6870000  # Paris is around 6860000 in Y
 
+    def test_convert_gps_to_lambert93_batch(self):
+        """Test that the batch conversion matches the single conversion"""
+        lons, lats = [2.2945, 5.3698], [48.8584, 43.2965]
+        xs, ys = convert_gps_to_lambert93_batch(lons, lats)
+
+        assert len(xs) == len(ys) == 2
+        for lon, lat, x, y in zip(lons, lats, xs, ys):
+            assert (x, y) == pytest.approx(convert_gps_to_lambert93(lon, lat))
+
+    def test_convert_gps_to_lambert93_batch_empty(self):
+        """Test the batch conversion with no coordinates"""
+        assert convert_gps_to_lambert93_batch([], []) == ([], [])
+
     @pytest.mark.asyncio
     async def test_geocode_returns_lambert93(self):
         """Verify that geocoding returns Lambert93 coordinates"""
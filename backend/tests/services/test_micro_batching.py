@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+import polars as pl
+from pathlib import Path
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.micro_batching import CoverageBatcher
+from services.sharding import LocalCoverage
+from services.spatial_index import SpatialIndex
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+
+@pytest.fixture(scope="module")
+def local():
+    coverage_df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+    return LocalCoverage(coverage_df, SpatialIndex(coverage_df))
+
+
+def make_points(ids, xs, ys) -> pl.DataFrame:
+    return pl.DataFrame({"id": ids, "x": xs, "y": ys}, schema={"id": pl.Utf8, "x": pl.Float64, "y": pl.Float64})
+
+
+class FailingCoverage:
+    def coverage_for_points(self, points, radius_by_tech):
+        raise ValueError("evaluation failed")
+
+
+class PickyCoverage:
+    """Fails the evaluation of any batch holding a point west of x=0"""
+
+    def __init__(self, local):
+        self.local = local
+
+    def coverage_for_points(self, points, radius_by_tech):
+        if (points['x'] < 0).any():
+            raise ValueError("evaluation failed")
+        return self.local.coverage_for_points(points, radius_by_tech)
+
+
+class TestCoverageBatcher:
+    """Tests for the CoverageBatcher class"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_a_batch(self, local):
+        """Test that concurrent requests are evaluated together and get their own results back"""
+        batcher = CoverageBatcher(window_ms=50)
+        # Both requests use the id "home", for different points
+        first = make_points(["home"], [103000.0], [6848000.0])
+        second = make_points(["home", "work"], [500000.0, 129000.0], [6500000.0, 6849000.0])
+
+        results = await asyncio.gather(
+            batcher.evaluate(local, first),
+            batcher.evaluate(local, second),
+        )
+        assert batcher.batches == 1
+        assert batcher.requests == 2
+        assert results[0] == local.coverage_for_points(first)
+        assert results[1] == local.coverage_for_points(second)
+        assert results[0]["home"]["Bouygues"]["4G"]
+        assert not results[1]["home"]["Bouygues"]["4G"]
+
+    @pytest.mark.asyncio
+    async def test_radii_are_batched_separately(self, local):
+        """Test that requests with different radii are not mixed"""
+        batcher = CoverageBatcher(window_ms=50)
+        points = make_points(["a"], [103000.0], [6848000.0])
+        small = {"2G": 10, "3G": 10, "4G": 10}
+        results = await asyncio.gather(
+            batcher.evaluate(local, points),
+            batcher.evaluate(local, points, small),
+        )
+        assert batcher.batches == 2
+        assert results[0] == local.coverage_for_points(points)
+        assert results[1] == local.coverage_for_points(points, small)
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_evaluated_at_once(self, local):
+        """Test that reaching the batch size does not wait for the window"""
+        batcher = CoverageBatcher(window_ms=60000, max_batch_points=3)
+        points = make_points(["a", "b"], [103000.0, 112000.0], [6848000.0, 6840000.0])
+        await asyncio.wait_for(
+            asyncio.gather(batcher.evaluate(local, points), batcher.evaluate(local, points)),
+            timeout=5,
+        )
+        assert batcher.batches == 1
+
+    @pytest.mark.asyncio
+    async def test_no_window(self, local):
+        """Test that a window of 0 evaluates each request on its own"""
+        batcher = CoverageBatcher(window_ms=0)
+        points = make_points(["a"], [103000.0], [6848000.0])
+        await asyncio.gather(batcher.evaluate(local, points), batcher.evaluate(local, points))
+        assert batcher.batches == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_request(self):
+        """Test that a source failing for every request fails each of them"""
+        batcher = CoverageBatcher(window_ms=10)
+        source = FailingCoverage()
+        points = make_points(["a"], [103000.0], [6848000.0])
+        results = await asyncio.gather(
+            batcher.evaluate(source, points),
+            batcher.evaluate(source, points),
+            return_exceptions=True,
+        )
+        assert batcher.batches == 1
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_invalid_points_do_not_join_a_batch(self, local):
+        """Test that a request with non-finite or out of bounds points does not break the others"""
+        batcher = CoverageBatcher(window_ms=50)
+        valid = make_points(["a"], [103000.0], [6848000.0])
+        invalid = make_points(["inf", "nan", "far", "b"], [float("inf"), float("nan"), 1e30, 103000.0], [6848000.0] * 4)
+
+        results = await asyncio.gather(
+            batcher.evaluate(local, valid),
+            batcher.evaluate(local, invalid),
+        )
+        assert batcher.batches == 1
+        assert results[0] == local.coverage_for_points(valid)
+        assert results[1]["inf"] == results[1]["nan"] == results[1]["far"] == {}
+        assert results[1]["b"] == results[0]["a"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_per_request(self, local):
+        """Test that when a merged evaluation fails, only the faulty request gets the error"""
+        batcher = CoverageBatcher(window_ms=50)
+        source = PickyCoverage(local)
+        valid = make_points(["a"], [103000.0], [6848000.0])
+        faulty = make_points(["a"], [-1000.0], [6848000.0])
+
+        results = await asyncio.gather(
+            batcher.evaluate(source, valid),
+            batcher.evaluate(source, faulty),
+            return_exceptions=True,
+        )
+        assert batcher.batches == 1
+        assert results[0] == local.coverage_for_points(valid)
+        assert isinstance(results[1], ValueError)
@@ -0,0 +1,56 @@
+import pytest
+from services.coverage_calculator import DEFAULT_RADIUS_BY_TECH
+from services.radius_presets import RadiusPresets, RadiusPresetError
+
+class TestRadiusPresets:
+    """Tests for the RadiusPresets registry"""
+
+    def test_default_preset(self):
+        """Test that the default preset holds the default radii"""
+        presets = RadiusPresets()
+        assert presets.resolve() == DEFAULT_RADIUS_BY_TECH
+        assert presets.all() == {"default": DEFAULT_RADIUS_BY_TECH}
+
+    def test_save_and_resolve(self):
+        """Test that a saved preset is resolved with per-technology overrides"""
+        presets = RadiusPresets()
+        presets.save("indoor", {"2G": 10000, "3G": 2000, "4G": 3000})
+
+        assert presets.get("indoor") == {"2G": 10000.0, "3G": 2000.0, "4G": 3000.0}
+        assert presets.resolve("indoor", {"2G": None, "4G": 1500}) == {"2G": 10000.0, "3G": 2000.0, "4G": 1500.0}
+
+    def test_resolve_does_not_change_preset(self):
+        """Test that overrides only apply to the request"""
+        presets = RadiusPresets()
+        presets.resolve(None, {"4G": 1.0})
+        assert presets.get("default") == DEFAULT_RADIUS_BY_TECH
+
+    def test_unknown_preset(self):
+        """Test that an unknown preset is rejected"""
+        with pytest.raises(RadiusPresetError):
+            RadiusPresets().resolve("unknown")
+
+    def test_default_is_read_only(self):
+        """Test that the default preset cannot be replaced"""
+        with pytest.raises(RadiusPresetError):
+            RadiusPresets().save("default", {"2G": 1, "3G": 1, "4G": 1})
+
+    def test_incomplete_preset(self):
+        """Test that a preset needs every technology"""
+        with pytest.raises(RadiusPresetError):
+            RadiusPresets().save("partial", {"2G": 1000})
+
+    @pytest.mark.parametrize("radius", [0, -1, float("inf"), float("nan"), 1e300])
+    def test_out_of_range_preset(self, radius):
+        """Test that a preset needs finite positive radii up to MAX_RADIUS"""
+        with pytest.raises(RadiusPresetError):
+            RadiusPresets().save("wide", {"2G": radius, "3G": 1000, "4G": 1000})
+
+    def test_max_presets(self, monkeypatch):
+        """Test that the number of saved presets is bounded"""
+        monkeypatch.setattr("services.radius_presets.MAX_PRESETS", 2)
+        presets = RadiusPresets()
+        presets.save("first", {"2G": 1, "3G": 1, "4G": 1})
+        presets.save("first", {"2G": 2, "3G": 2, "4G": 2})
+        with pytest.raises(RadiusPresetError):
+            presets.save("second", {"2G": 1, "3G": 1, "4G": 1})
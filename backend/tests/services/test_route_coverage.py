@@ -0,0 +1,92 @@
+import pytest
+import polars as pl
+from pathlib import Path
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.coverage_calculator import compute_coverage_for_point
+from services.route_coverage import densify_polyline, compute_route_coverage, RouteError
+from services.spatial_index import SpatialIndex
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+class TestDensifyPolyline:
+    """Tests for the densify_polyline function"""
+
+    def test_densify_spacing_and_vertices(self):
+        """Test that samples are evenly spaced and include every vertex"""
+        vertices = pl.DataFrame({'x': [0.0, 1000.0, 1000.0], 'y': [0.0, 0.0, 250.0]})
+        samples = densify_polyline(vertices, spacing=100.0)
+
+        assert samples['distance'].to_list() == pytest.approx(
+            [i * 100.0 for i in range(11)] + [1083.333333, 1166.666667, 1250.0]
+        )
+        assert samples.row(10)[1:3] == (1000.0, 0.0)
+        assert samples.row(-1)[1:3] == (1000.0, 250.0)
+
+    def test_densify_needs_two_points(self):
+        """Test that a single vertex is rejected"""
+        with pytest.raises(RouteError):
+            densify_polyline(pl.DataFrame({'x': [0.0], 'y': [0.0]}))
+
+    def test_densify_too_many_samples(self):
+        """Test that a huge route with a tiny spacing is rejected"""
+        vertices = pl.DataFrame({'x': [0.0, 1000000.0], 'y': [0.0, 0.0]})
+        with pytest.raises(RouteError):
+            densify_polyline(vertices, spacing=1.0)
+
+class TestComputeRouteCoverage:
+    """Tests for the compute_route_coverage function"""
+
+    @pytest.fixture
+    def coverage_df(self):
+        """Fixture providing the test coverage DataFrame"""
+        return load_coverage_measure_from_csv(TEST_CSV_PATH)
+
+    @pytest.fixture
+    def vertices(self):
+        """Route from the first Orange site to the Free site, then far away"""
+        return pl.DataFrame({
+            'x': [102980.0, 129220.0, 229220.0],
+            'y': [6847973.0, 6848789.0, 6848789.0]
+        })
+
+    def test_intervals_cover_the_route(self, coverage_df, vertices):
+        """Test that intervals are contiguous, alternate and span the route"""
+        result = compute_route_coverage(vertices, coverage_df, spacing=500.0)
+
+        for operator, techs in result["coverage"].items():
+            for tech, intervals in techs.items():
+                assert intervals[0]["start"] == 0.0
+                assert intervals[-1]["end"] == pytest.approx(result["length"])
+                for previous, current in zip(intervals, intervals[1:]):
+                    assert previous["end"] == current["start"]
+                    assert previous["covered"] != current["covered"]
+
+    def test_intervals_match_point_coverage(self, coverage_df, vertices):
+        """Test that every sample lies in an interval matching its own coverage"""
+        result = compute_route_coverage(vertices, coverage_df, spacing=2000.0)
+        samples = densify_polyline(vertices, spacing=2000.0)
+
+        for _, x, y, distance in samples.head(-1).iter_rows():
+            coverage = compute_coverage_for_point(x, y, coverage_df)
+            for operator, techs in coverage.items():
+                for tech, covered in techs.items():
+                    interval = next(
+                        i for i in result["coverage"][operator][tech]
+                        if i["start"] <= distance < i["end"]
+                    )
+                    assert interval["covered"] is covered
+
+    def test_index_gives_same_intervals(self, coverage_df, vertices):
+        """Test that the spatial index path matches per-call bucketing"""
+        index = SpatialIndex(coverage_df)
+        for radius_by_tech in [None, {"2G": 1000, "3G": 300, "4G": 40000}]:
+            expected = compute_route_coverage(vertices, coverage_df, 500.0, radius_by_tech)
+            assert compute_route_coverage(vertices, coverage_df, 500.0, radius_by_tech, index) == expected
+
+    def test_free_2g_never_covered(self, coverage_df, vertices):
+        """Test that a technology without antennas is a single uncovered interval"""
+        result = compute_route_coverage(vertices, coverage_df)
+
+        intervals = result["coverage"]["Free"]["2G"]
+        assert len(intervals) == 1
+        assert intervals[0]["covered"] is False
@@ -0,0 +1,124 @@
+import pytest
+import polars as pl
+from pathlib import Path
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.sharding import ShardedCoverage, LocalCoverage, ShardError, assign_tiles
+from services.spatial_index import SpatialIndex
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+# Small shards so that the 6 test antennas are spread over several workers
+SHARD_SIZE = 10000
+HALO = 5000
+
+
+@pytest.fixture(scope="module")
+def shards():
+    """Three shard worker processes over the test CSV"""
+    coverage_shards = ShardedCoverage(TEST_CSV_PATH, workers=3, shard_size=SHARD_SIZE, halo=HALO).start()
+    yield coverage_shards
+    coverage_shards.close()
+
+
+@pytest.fixture(scope="module")
+def local():
+    coverage_df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+    return LocalCoverage(coverage_df, SpatialIndex(coverage_df))
+
+
+def grid_points() -> pl.DataFrame:
+    """Points every 2 km around the test antennas, including empty tiles"""
+    xs = range(90000, 140000, 2000)
+    ys = range(6790000, 6860000, 2000)
+    return pl.DataFrame({
+        "id": [f"{x}_{y}" for x in xs for y in ys],
+        "x": [float(x) for x in xs for y in ys],
+        "y": [float(y) for x in xs for y in ys],
+    })
+
+
+class TestAssignTiles:
+    """Tests for the assign_tiles function"""
+
+    def test_balanced_groups(self):
+        """Test that tiles are split into contiguous groups of similar counts"""
+        tile_counts = pl.DataFrame({
+            "tx": [0, 1, 2, 0, 1, 2],
+            "ty": [0, 0, 0, 1, 1, 1],
+            "count": [10, 10, 10, 10, 10, 10],
+        })
+        groups = assign_tiles(tile_counts, 3)
+        assert groups == [[(0, 0), (1, 0)], [(2, 0), (0, 1)], [(1, 1), (2, 1)]]
+
+    def test_fewer_tiles_than_workers(self):
+        """Test that no worker is left without tiles"""
+        tile_counts = pl.DataFrame({"tx": [0], "ty": [0], "count": [5]})
+        assert assign_tiles(tile_counts, 4) == [[(0, 0)]]
+
+
+class TestShardedCoverage:
+    """Tests for the ShardedCoverage class"""
+
+    def test_workers_hold_their_shards(self, shards):
+        """Test that the antennas are spread over several worker processes"""
+        assert len(shards.sizes) == 3
+        # Every antenna is in one core tile; halos may copy some of them
+        assert sum(shards.sizes) >= 6
+        assert shards.operators == ["Bouygues", "Free", "Orange", "SFR"]
+
+    @pytest.mark.parametrize("radius_by_tech", [
+        None,
+        {"2G": 1000, "3G": 3000, "4G": 5000},
+        {"2G": 4000, "3G": 12000, "4G": 50000},
+    ])
+    def test_matches_local_coverage(self, shards, local, radius_by_tech):
+        """Test that merged shard results equal the single process results, within and beyond the halo"""
+        points = grid_points()
+        assert shards.coverage_for_points(points, radius_by_tech) == local.coverage_for_points(points, radius_by_tech)
+
+    def test_owner_routing(self, shards):
+        """Test that radii within the halo send each point to a single worker"""
+        points = pl.DataFrame({"id": ["a", "b"], "x": [102980.0, 129220.0], "y": [6847973.0, 6848789.0]})
+        assert shards.route(points, HALO).group_by('id').len()['len'].to_list() == [1, 1]
+
+    def test_single_point(self, shards, local):
+        """Test the coverage of a single point"""
+        assert shards.coverage_for_point(103000, 6848000) == local.coverage_for_point(103000, 6848000)
+        assert shards.coverage_for_point(103000, 6848000)["Bouygues"]["4G"]
+
+    def test_stale_reply_is_skipped(self, shards, local):
+        """Test that a reply left unread in a pipe is not taken for the next request"""
+        stale = pl.DataFrame({"id": ["0"], "x": [103000.0], "y": [6848000.0]})
+        with shards._locks[0]:
+            shards._connections[0].send((-1, stale, {"2G": 30000, "3G": 5000, "4G": 10000}))
+
+        points = grid_points()
+        assert shards.coverage_for_points(points) == local.coverage_for_points(points)
+
+
+class TestShardedCoverageFailures:
+    """Tests for the handling of stopped shard workers"""
+
+    def test_stopped_worker(self, local):
+        """Test that a stopped worker fails its requests with a ShardError, and only those"""
+        shards = ShardedCoverage(TEST_CSV_PATH, workers=3, shard_size=SHARD_SIZE, halo=HALO).start()
+        try:
+            points = grid_points()
+            routes = shards.route(points, HALO)
+            dead = routes['worker'][0]
+            shards._processes[dead].kill()
+            shards._processes[dead].join()
+
+            with pytest.raises(ShardError):
+                shards.coverage_for_points(points)
+            assert dead in shards.failed
+            with pytest.raises(ShardError, match="not running"):
+                shards.coverage_for_points(points)
+
+            # Points routed to the other workers are still answered correctly
+            alive = points.join(routes.filter(pl.col('worker') != dead), on='id', how='semi')
+            alive = alive.join(routes.filter(pl.col('worker') == dead), on='id', how='anti')
+            small = {"2G": 1000, "3G": 3000, "4G": 5000}
+            assert shards.coverage_for_points(alive, small) == local.coverage_for_points(alive, small)
+        finally:
+            shards.close()
@@ -0,0 +1,178 @@
+import pytest
+import polars as pl
+from pathlib import Path
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.coverage_calculator import compute_coverage_hits
+from services.spatial_index import SpatialIndex, nearest_to_dict
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+def brute_force_nearest(df, x, y, operator, tech, k):
+    """Reference k-NN by sorting the whole table"""
+    return (
+        df.filter((pl.col('operator') == operator) & pl.col(tech))
+        .with_columns(
+            ((pl.col('x_lambert93') - x) ** 2 + (pl.col('y_lambert93') - y) ** 2).sqrt().alias('distance')
+        )
+        .sort('distance')
+        .head(k)['distance']
+        .to_list()
+    )
+
+class TestSpatialIndexNearest:
+    """Tests for SpatialIndex.nearest"""
+
+    @pytest.fixture
+    def coverage_df(self):
+        """Fixture providing the test coverage DataFrame"""
+        return load_coverage_measure_from_csv(TEST_CSV_PATH)
+
+    @pytest.fixture
+    def points(self):
+        """Points on a site, near the sites and far from all of them"""
+        return pl.DataFrame({
+            'id': ['orange_1', 'near', 'far'],
+            'x': [102980.0, 110000.0, 999999.0],
+            'y': [6847973.0, 6830000.0, 999999.0]
+        })
+
+    def test_nearest_matches_brute_force(self, coverage_df, points):
+        """Test that distances match a full sort, close and far from the sites"""
+        index = SpatialIndex(coverage_df, cell_size=1000.0)
+        nearest = index.nearest(points, k=2)
+
+        for point_id, x, y in points.iter_rows():
+            for operator in ['Orange', 'SFR', 'Bouygues', 'Free']:
+                for tech in ['2G', '3G', '4G']:
+                    found = nearest.filter(
+                        (pl.col('id') == point_id) & (pl.col('operator') == operator) & (pl.col('tech') == tech)
+                    )['distance'].to_list()
+                    assert found == pytest.approx(brute_force_nearest(coverage_df, x, y, operator, tech, 2))
+
+    def test_nearest_point_on_site(self, coverage_df, points):
+        """Test that the antenna under the point comes first at distance 0"""
+        index = SpatialIndex(coverage_df)
+        result = nearest_to_dict(index.nearest(points, k=3))
+
+        closest = result['orange_1']['Orange']['2G'][0]
+        assert closest == {"x_lambert93": 102980.0, "y_lambert93": 6847973.0, "distance": 0.0}
+        # Orange has 2 antennas with 2G, both are returned
+        assert len(result['orange_1']['Orange']['2G']) == 2
+        # Free has no 2G antenna
+        assert '2G' not in result['orange_1']['Free']
+
+    def test_nearest_empty_points(self, coverage_df):
+        """Test that no points gives an empty result"""
+        index = SpatialIndex(coverage_df)
+        empty = pl.DataFrame(schema={'id': pl.Utf8, 'x': pl.Float64, 'y': pl.Float64})
+        assert index.nearest(empty).height == 0
+
+class TestSpatialIndexDelta:
+    """Tests for SpatialIndex.with_delta"""
+
+    def test_delta_matches_rebuild(self):
+        """Test that a patched index equals an index built from the updated data"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        removed = df.filter(pl.col('operator') == 'Orange')
+        added = pl.DataFrame({
+            'operator': ['Orange', 'Free'], 'x_lambert93': [500000, 129300], 'y_lambert93': [6500000, 6848800],
+            '2G': [True, False], '3G': [True, True], '4G': [False, True],
+        }).cast(df.schema)
+        updated = pl.concat([df.filter(pl.col('operator') != 'Orange'), added])
+
+        index = SpatialIndex(df, cell_size=1000.0)
+        patched = index.with_delta(removed, added)
+        rebuilt = SpatialIndex(updated, cell_size=1000.0)
+
+        assert patched.antennas.sort(pl.all()).equals(rebuilt.antennas.sort(pl.all()))
+        assert patched.group_sizes.sort(pl.all()).equals(rebuilt.group_sizes.sort(pl.all()))
+        for (_, counts), (_, expected) in zip(patched.pyramid, rebuilt.pyramid):
+            assert counts.sort(pl.all()).equals(expected.select(counts.columns).sort(pl.all()))
+        # The original index is left untouched
+        assert index.antennas.height == SpatialIndex(df).antennas.height
+
+        point = pl.DataFrame({'id': ['p'], 'x': [500100.0], 'y': [6500000.0]})
+        nearest = nearest_to_dict(patched.nearest(point, k=1))
+        assert nearest['p']['Orange']['2G'][0]['distance'] == pytest.approx(100.0)
+
+    def test_delta_patches_coverage_grids(self):
+        """Test that cached coverage grids survive a delta and match a rebuild"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        removed = df.filter(pl.col('operator') == 'Orange')
+        added = pl.DataFrame({
+            'operator': ['Orange', 'Free'], 'x_lambert93': [103000, 129300], 'y_lambert93': [6848000, 6848800],
+            '2G': [True, False], '3G': [True, True], '4G': [False, True],
+        }).cast(df.schema)
+        updated = pl.concat([df.filter(pl.col('operator') != 'Orange'), added])
+
+        index = SpatialIndex(df)
+        radius_by_tech = {"2G": 30000, "3G": 5000, "4G": 10000}
+        for tech, radius in radius_by_tech.items():
+            index.coverage_grid(tech, radius)
+        patched = index.with_delta(removed, added)
+        assert set(patched._coverage_grids) == set(index._coverage_grids)
+
+        rebuilt = SpatialIndex(updated)
+        for tech, radius in radius_by_tech.items():
+            cell_size, antennas, operators_by_cell = patched.coverage_grid(tech, radius)
+            _, expected_antennas, expected_operators = rebuilt.coverage_grid(tech, radius)
+            assert antennas.sort(pl.all()).equals(expected_antennas.sort(pl.all()))
+            assert operators_by_cell.sort(pl.all()).equals(expected_operators.sort(pl.all()))
+
+    def test_chained_deltas_keep_cells_sorted(self):
+        """Test that chained deltas rewrite cells in place, keeping the tables sorted by cell"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        index = SpatialIndex(df, cell_size=1000.0)
+        index.coverage_grid('4G', 10000)
+        for shift in [1, 2500, 40000]:
+            removed = df.head(2)
+            added = removed.with_columns(pl.col('x_lambert93') + shift)
+            df = pl.concat([df.slice(2), added])
+            index = index.with_delta(removed, added)
+
+        rebuilt = SpatialIndex(df, cell_size=1000.0)
+        assert index.antennas.sort(pl.all()).equals(rebuilt.antennas.sort(pl.all()))
+        assert index.antennas.select(pl.col('cx') * 2 ** 32 + pl.col('cy')).to_series().is_sorted()
+        for _, counts in index.pyramid[1:]:
+            assert counts.select(pl.col('lx') * 2 ** 32 + pl.col('ly')).to_series().is_sorted()
+        _, antennas, _ = index.coverage_grid('4G', 10000)
+        assert antennas.select(pl.col('cx') * 2 ** 32 + pl.col('cy')).to_series().is_sorted()
+
+        box = (100000.0, 6800000.0, 200000.0, 6900000.0)
+        assert index.antennas_in_box(*box).sort(pl.all()).equals(rebuilt.antennas_in_box(*box).sort(pl.all()))
+
+    def test_empty_delta(self):
+        """Test that an empty delta gives an equal index"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        index = SpatialIndex(df)
+        patched = index.with_delta(df.clear(), df.clear())
+        assert patched.antennas.equals(index.antennas)
+
+class TestSpatialIndexCoverage:
+    """Tests for SpatialIndex.coverage_hits"""
+
+    @pytest.mark.parametrize("radius_by_tech", [
+        {"2G": 30000, "3G": 5000, "4G": 10000},
+        {"2G": 700, "3G": 100, "4G": 26300},
+        {"2G": 1, "3G": 1000000, "4G": 12000},
+    ])
+    def test_matches_coverage_hits(self, radius_by_tech):
+        """Test that cached grids give the same hits as per-call bucketing, for any radius"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        points = pl.DataFrame({
+            'id': [str(i) for i in range(400)],
+            'x': [95000.0 + 200.0 * (i % 20) + 1700.0 * (i // 20) for i in range(400)],
+            'y': [6840000.0 + 450.0 * (i % 20) - 900.0 * (i // 20) for i in range(400)],
+        })
+        hits = SpatialIndex(df).coverage_hits(points, radius_by_tech)
+        expected = compute_coverage_hits(points, df, radius_by_tech)
+        assert hits.sort(pl.all()).equals(expected.sort(pl.all()))
+
+    def test_grids_are_cached(self):
+        """Test that close radii share one grid, built once"""
+        index = SpatialIndex(load_coverage_measure_from_csv(TEST_CSV_PATH))
+        cell_size, antennas, _ = index.coverage_grid('4G', 10000)
+
+        assert 5000 <= cell_size <= 7072
+        assert index.coverage_grid('4G', 10500)[1] is antennas
+        assert index.coverage_grid('4G', 2000)[1] is not antennas
@@ -0,0 +1,61 @@
+import pytest
+from pathlib import Path
+from services.antenna_tiles import AntennaTiles
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.spatial_index import SpatialIndex
+from services.startup import StartupProgress, warm_up_queries
+
+TEST_CSV_PATH = Path(__file__).parent.parent / "data" / "test_coverage_measure.csv"
+
+class TestStartupProgress:
+    """Tests for the StartupProgress class"""
+
+    def test_phases_are_timed(self):
+        """Test that each phase records its status and duration"""
+        startup = StartupProgress()
+        assert startup.run("double", lambda value: value * 2, 21) == 42
+        assert startup.loading
+
+        startup.mark_ready()
+        report = startup.report()
+        assert report["ready"]
+        assert report["phases"]["double"]["status"] == "done"
+        assert report["phases"]["double"]["duration_ms"] >= 0
+        assert report["elapsed_ms"] >= report["phases"]["double"]["duration_ms"]
+
+    def test_failed_phase(self):
+        """Test that a failing phase prevents readiness"""
+        startup = StartupProgress()
+        with pytest.raises(FileNotFoundError):
+            startup.run("load_csv", load_coverage_measure_from_csv, "missing.csv")
+        startup.mark_ready()
+
+        report = startup.report()
+        assert not report["ready"]
+        assert not startup.loading
+        assert report["phases"]["load_csv"]["status"] == "failed"
+        assert report["error"].startswith("load_csv")
+
+    def test_error_outside_phases(self):
+        """Test that an error recorded outside of a phase prevents readiness"""
+        startup = StartupProgress()
+        startup.run("load_csv", lambda: None)
+        startup.fail("publish: boom")
+        startup.fail("later error")
+        startup.mark_ready()
+
+        report = startup.report()
+        assert not report["ready"]
+        assert report["error"] == "publish: boom"
+
+class TestWarmUp:
+    """Tests for the warm_up_queries function"""
+
+    def test_warm_up_builds_caches(self):
+        """Test that the coverage grids and the world tile are built"""
+        df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        index, tiles = SpatialIndex(df), AntennaTiles(df, "test-version")
+        warm_up_queries(index, tiles)
+
+        assert len(index._coverage_grids) == 3
+        assert (0, 0, 0) in tiles._tile_cache
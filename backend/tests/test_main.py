@@ -1,10 +1,44 @@
+import asyncio
+import httpx
+import pytest
+import polars as pl
 from fastapi.testclient import TestClient
+from pathlib import Path
 from unittest.mock import patch
 
-from main import app, convert_coverage_to_model
+from main import (
+    app, convert_coverage_to_model, get_coverage_data, get_coverage_index, get_antenna_tiles,
+    get_coverage_source, load_coverage_data
+)
+from services.antenna_tiles import AntennaTiles
+from services.coverage_loader import load_coverage_measure_from_csv
+from services.dataset import CoverageDataset
+from models import GeocodeResult
+from services.geocoding import GeocodingError
+from services.micro_batching import CoverageBatcher
+from services.radius_presets import RadiusPresets
+from services.startup import StartupProgress
+from services.sharding import LocalCoverage
+from services.spatial_index import SpatialIndex
 
 client = TestClient(app)
 
+TEST_CSV_PATH = Path(__file__).parent / "data" / "test_coverage_measure.csv"
+
+@pytest.fixture
+def test_coverage_data():
+    """Serve the test CSV through the coverage data dependencies"""
+    coverage_df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+    coverage_index = SpatialIndex(coverage_df)
+    antenna_tiles = AntennaTiles(coverage_df, "test-version")
+    app.dependency_overrides[get_coverage_data] = lambda: coverage_df
+    app.dependency_overrides[get_coverage_index] = lambda: coverage_index
+    app.dependency_overrides[get_antenna_tiles] = lambda: antenna_tiles
+    local_coverage = LocalCoverage(coverage_df, coverage_index)
+    app.dependency_overrides[get_coverage_source] = lambda: local_coverage
+    yield coverage_df
+    app.dependency_overrides.clear()
+
 class TestMainAPI:
     """Tests for the main API endpoints"""
     
@@ -142,6 +176,496 @@ class TestMainAPI:
         assert not data["id2"]["orange"]["2G"]
         assert not data["id2"]["orange"]["3G"]
 
+class TestCoordinateInput:
+    """Tests for pre-geocoded coordinates in coverage requests"""
+
+    @patch('main.geocode_address')
+    def test_coverage_with_lambert93_coordinates(self, mock_geocode, test_coverage_data):
+        """Test that Lambert93 coordinates bypass the geocoder"""
+        response = client.post("/coverage", json={
+            "id1": {"x": 102980.0, "y": 6847973.0}
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id1"]["orange"]["2G"]
+        assert data["id1"]["orange"]["3G"]
+        mock_geocode.assert_not_called()
+
+    @patch('main.geocode_address')
+    def test_coverage_with_gps_coordinates(self, mock_geocode, test_coverage_data):
+        """Test that WGS84 coordinates are projected and bypass the geocoder"""
+        response = client.post("/coverage", json={
+            "paris": {"lon": 2.2945, "lat": 48.8584}
+        })
+
+        assert response.status_code == 200
+        assert "paris" in response.json()
+        mock_geocode.assert_not_called()
+
+    @patch('main.geocode_address')
+    def test_coverage_with_mixed_batch(self, mock_geocode, test_coverage_data):
+        """Test a batch mixing addresses, Lambert93 and WGS84 coordinates"""
+        mock_geocode.return_value = None
+
+        response = client.post("/coverage", json={
+            "address": "adresse_inexistante_xyz123",
+            "lambert": {"x": 129220.0, "y": 6848789.0},
+            "gps": {"lon": 2.2945, "lat": 48.8584}
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data.keys()) == ["address", "lambert", "gps"]
+        assert not data["address"]["Free"]["3G"]
+        assert data["lambert"]["Free"]["3G"]
+        assert data["lambert"]["Free"]["4G"]
+        mock_geocode.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch('main.geocode_address')
+    async def test_concurrent_requests_are_batched(self, mock_geocode, test_coverage_data):
+        """Test that concurrent requests, geocoded or not, are evaluated in one batch"""
+        mock_geocode.return_value = GeocodeResult(
+            longitude=0.0, latitude=0.0, x_lambert93=129220.0, y_lambert93=6848789.0, address_found="Free site"
+        )
+        batcher = CoverageBatcher(window_ms=100)
+        transport = httpx.ASGITransport(app=app)
+        with patch('main.coverage_batcher', batcher):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+                responses = await asyncio.gather(
+                    async_client.post("/coverage", json={"id1": "Free site address"}),
+                    async_client.post("/coverage", json={"id1": {"x": 102980.0, "y": 6847973.0}}),
+                )
+
+        assert batcher.batches == 1
+        assert batcher.requests == 2
+        free_site, orange_site = [response.json()["id1"] for response in responses]
+        assert free_site["Free"]["4G"]
+        assert not free_site["bouygues"]["4G"]
+        assert orange_site["orange"]["2G"]
+
+    def test_coverage_with_incomplete_coordinates(self, test_coverage_data):
+        """Test that a coordinate object needs a complete lon/lat or x/y pair"""
+        response = client.post("/coverage", json={"id1": {"x": 102980.0}})
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize("point", [
+        {"lon": 2.3, "lat": 200.0},
+        {"lon": 181.0, "lat": 48.0},
+        {"x": 1e30, "y": 1e30},
+        {"x": 102980.0, "y": 0.0},
+    ])
+    def test_coordinates_out_of_range(self, test_coverage_data, point):
+        """Test that out of range coordinates are rejected on every endpoint taking points"""
+        assert client.post("/coverage", json={"id1": point}).status_code == 422
+        assert client.post("/antennas/nearest", json={"points": {"id1": point}}).status_code == 422
+        route = {"points": [point, {"x": 102980.0, "y": 6847973.0}]}
+        assert client.post("/coverage/route", json=route).status_code == 422
+
+    def test_coordinates_without_projection(self, test_coverage_data):
+        """Test that WGS84 points with no Lambert93 projection are rejected"""
+        response = client.post("/coverage", json={"pole": {"lon": 0.0, "lat": -90.0}})
+        assert response.status_code == 422
+
+class TestPointsCoverage:
+    """Tests for the columnar points coverage endpoint"""
+
+    def test_lambert93_columns(self, test_coverage_data):
+        """Test that each point gets the same coverage as from /coverage, in order"""
+        columns = {"x": [129220.0, 102980.0], "y": [6848789.0, 6847973.0]}
+        response = client.post("/coverage/points", json=columns)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        by_id = client.post("/coverage", json={
+            str(i): {"x": x, "y": y} for i, (x, y) in enumerate(zip(columns["x"], columns["y"]))
+        }).json()
+        for operator in ["orange", "SFR", "bouygues", "Free"]:
+            for tech in ["2G", "3G", "4G"]:
+                assert data["coverage"][operator][tech] == [by_id["0"][operator][tech], by_id["1"][operator][tech]]
+        assert data["coverage"]["Free"]["4G"][0]
+        assert data["coverage"]["orange"]["2G"][1]
+
+    def test_gps_columns(self, test_coverage_data):
+        """Test that WGS84 columns are projected"""
+        response = client.post("/coverage/points", json={"lon": [2.2945], "lat": [48.8584]})
+        assert response.status_code == 200
+        assert len(response.json()["coverage"]["orange"]["4G"]) == 1
+
+    def test_empty_columns(self, test_coverage_data):
+        """Test that empty columns give an empty answer"""
+        response = client.post("/coverage/points", json={"x": [], "y": []})
+        assert response.status_code == 200
+        assert response.json()["count"] == 0
+
+    @pytest.mark.parametrize("columns", [
+        {"x": [102980.0, 102990.0], "y": [6847973.0]},
+        {"x": [102980.0], "y": [6847973.0], "lon": [2.3], "lat": [48.8]},
+        {"x": [1e30], "y": [6847973.0]},
+        {"lon": [2.3], "lat": [200.0]},
+        {"lon": [0.0], "lat": [-90.0]},
+    ])
+    def test_invalid_columns(self, test_coverage_data, columns):
+        """Test that mismatched, mixed or out of range columns are rejected"""
+        assert client.post("/coverage/points", json=columns).status_code == 422
+
+class TestNearestAntennas:
+    """Tests for the k-nearest antennas endpoint"""
+
+    def test_nearest_antennas(self, test_coverage_data):
+        """Test the k nearest antennas of a point on an Orange site"""
+        response = client.post("/antennas/nearest", json={
+            "k": 2,
+            "points": {"id1": {"x": 102980.0, "y": 6847973.0}}
+        })
+
+        assert response.status_code == 200
+        orange_3g = response.json()["id1"]["Orange"]["3G"]
+        assert len(orange_3g) == 2
+        assert orange_3g[0]["distance"] == 0.0
+        assert orange_3g[0]["distance"] <= orange_3g[1]["distance"]
+
+    def test_nearest_antennas_no_points(self, test_coverage_data):
+        """Test the nearest antennas endpoint without points"""
+        response = client.post("/antennas/nearest", json={"points": {}})
+        assert response.status_code == 400
+
+    def test_nearest_antennas_invalid_k(self, test_coverage_data):
+        """Test that k must be positive"""
+        response = client.post("/antennas/nearest", json={
+            "k": 0,
+            "points": {"id1": {"x": 102980.0, "y": 6847973.0}}
+        })
+        assert response.status_code == 422
+
+class TestAntennaMap:
+    """Tests for the bbox and tile endpoints used by the map"""
+
+    def test_antennas_in_bbox(self, test_coverage_data):
+        """Test the bbox endpoint over the whole of France"""
+        response = client.get("/antennas", params={
+            "min_lon": -10.0, "min_lat": 40.0, "max_lon": 10.0, "max_lat": 52.0
+        })
+
+        assert response.status_code == 200
+        antennas = response.json()
+        assert len(antennas) == 6
+        assert {"operator", "lon", "lat", "2G", "3G", "4G"} <= set(antennas[0])
+
+    def test_antennas_invalid_bbox(self, test_coverage_data):
+        """Test that an inverted bbox is rejected"""
+        response = client.get("/antennas", params={
+            "min_lon": 10.0, "min_lat": 40.0, "max_lon": -10.0, "max_lat": 52.0
+        })
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("params", [
+        {"limit": -5},
+        {"limit": 0},
+        {"limit": 10 ** 9},
+        {"min_lat": -100.0},
+    ])
+    def test_antennas_invalid_parameters(self, test_coverage_data, params):
+        """Test that out of range limits and coordinates are rejected"""
+        bbox = {"min_lon": -10.0, "min_lat": 40.0, "max_lon": 10.0, "max_lat": 52.0}
+        response = client.get("/antennas", params={**bbox, **params})
+        assert response.status_code == 422
+
+    def test_antennas_limit(self, test_coverage_data):
+        """Test that the bbox endpoint returns at most limit antennas"""
+        response = client.get("/antennas", params={
+            "min_lon": -10.0, "min_lat": 40.0, "max_lon": 10.0, "max_lat": 52.0, "limit": 2
+        })
+        assert len(response.json()) == 2
+
+    def test_antenna_tile_cache_headers(self, test_coverage_data):
+        """Test that tiles carry an ETag tied to the dataset version"""
+        response = client.get("/antennas/tiles/0/0/0")
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"test-version-0-0-0"'
+        assert "no-cache" in response.headers["cache-control"]
+        assert len(response.json()["antennas"]) == 6
+
+    def test_antenna_tile_not_modified(self, test_coverage_data):
+        """Test that a matching If-None-Match returns 304"""
+        response = client.get("/antennas/tiles/0/0/0", headers={"If-None-Match": '"test-version-0-0-0"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.parametrize("if_none_match, status", [
+        ('"other", "test-version-0-0-0"', 304),
+        ('W/"test-version-0-0-0"', 304),
+        ('*', 304),
+        ('"other-version-0-0-0"', 200),
+    ])
+    def test_antenna_tile_if_none_match(self, test_coverage_data, if_none_match, status):
+        """Test that ETag lists, weak tags and * are matched"""
+        response = client.get("/antennas/tiles/0/0/0", headers={"If-None-Match": if_none_match})
+        assert response.status_code == status
+
+    def test_antenna_tile_out_of_range(self, test_coverage_data):
+        """Test that a tile outside the zoom level grid is not found"""
+        response = client.get("/antennas/tiles/1/2/0")
+        assert response.status_code == 404
+
+class TestRouteCoverage:
+    """Tests for the route coverage endpoint"""
+
+    def test_route_coverage(self, test_coverage_data):
+        """Test a Lambert93 route starting on the first Orange site"""
+        response = client.post("/coverage/route", json={
+            "points": [{"x": 102980.0, "y": 6847973.0}, {"x": 129220.0, "y": 6848789.0}],
+            "spacing": 500.0
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["length"] == pytest.approx(26252.684739)
+        orange_2g = data["coverage"]["Orange"]["2G"]
+        assert orange_2g[0]["start"] == 0.0
+        assert orange_2g[0]["covered"]
+
+    def test_route_coverage_needs_two_points(self, test_coverage_data):
+        """Test that a route with a single point is rejected"""
+        response = client.post("/coverage/route", json={
+            "points": [{"lon": 2.2945, "lat": 48.8584}]
+        })
+        assert response.status_code == 422
+
+    def test_route_coverage_too_many_samples(self, test_coverage_data):
+        """Test that a route needing too many samples is rejected"""
+        response = client.post("/coverage/route", json={
+            "points": [{"x": 100000.0, "y": 6800000.0}, {"x": 1100000.0, "y": 6800000.0}],
+            "spacing": 1.0
+        })
+        assert response.status_code == 400
+
+class TestAreaCoverage:
+    """Tests for the area coverage endpoint"""
+
+    def test_area_coverage_bbox(self, test_coverage_data):
+        """Test a Lambert93 bbox around the first sites"""
+        response = client.post("/coverage/area", json={
+            "bbox": [{"x": 90000.0, "y": 6830000.0}, {"x": 130000.0, "y": 6870000.0}],
+            "resolution": 1000.0
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["cells"] == 1600
+        assert 0.0 < data["coverage"]["Orange"]["2G"] <= 1.0
+        assert data["coverage"]["Free"]["2G"] == 0.0
+
+    def test_area_coverage_polygon_projects_wgs84(self, test_coverage_data):
+        """Test that a polygon given in WGS84 is projected before rasterization"""
+        response = client.post("/coverage/area", json={
+            "polygon": [[
+                {"lon": 2.29, "lat": 48.85}, {"lon": 2.30, "lat": 48.85}, {"lon": 2.30, "lat": 48.86}
+            ]],
+            "resolution": 50.0
+        })
+
+        assert response.status_code == 200
+        assert response.json()["cells"] > 0
+
+    @patch('main.fetch_commune_contour')
+    def test_area_coverage_commune(self, mock_contour, test_coverage_data):
+        """Test that the commune contour is fetched and evaluated"""
+        mock_contour.return_value = [[(-1.0, 48.0), (-0.9, 48.0), (-0.9, 48.1), (-1.0, 48.1)]]
+        response = client.post("/coverage/area", json={"commune": "53130"})
+
+        assert response.status_code == 200
+        mock_contour.assert_called_once_with("53130")
+
+    @patch('main.fetch_commune_contour')
+    def test_area_coverage_unknown_commune(self, mock_contour, test_coverage_data):
+        """Test that a commune without contour is rejected"""
+        mock_contour.side_effect = GeocodingError("HTTP error: 404")
+        response = client.post("/coverage/area", json={"commune": "00000"})
+        assert response.status_code == 400
+
+    def test_area_coverage_needs_single_zone(self, test_coverage_data):
+        """Test that a request with both a bbox and a commune is rejected"""
+        response = client.post("/coverage/area", json={
+            "bbox": [{"x": 100000.0, "y": 6800000.0}, {"x": 100001.0, "y": 6800001.0}],
+            "commune": "75056"
+        })
+        assert response.status_code == 422
+
+class TestAntennaDelta:
+    """Tests for the antenna delta endpoint"""
+
+    @pytest.fixture
+    def loaded_state(self):
+        """Load the test CSV into the application state, restored afterwards"""
+        saved = getattr(app.state, "dataset", None)
+        coverage_df = load_coverage_measure_from_csv(TEST_CSV_PATH)
+        app.state.dataset = CoverageDataset(
+            coverage_df, SpatialIndex(coverage_df), AntennaTiles(coverage_df, "test-version"), "test-version"
+        )
+        yield
+        app.state.dataset = saved
+
+    def test_apply_delta(self, loaded_state):
+        """Test that a delta swaps in an updated dataset and reports it"""
+        delta = (
+            "action,Operateur,x,y,2G,3G,4G\n"
+            "remove,Orange,102980,6847973,,,\n"
+            "add,SFR,100000,6800000,1,0,1\n"
+        )
+        previous = app.state.dataset
+        response = client.post("/antennas/delta", files={"file": ("delta.csv", delta, "text/csv")})
+
+        assert response.status_code == 200
+        data = response.json()
+        # A new snapshot is published; the one in use by earlier requests is unchanged
+        assert app.state.dataset is not previous
+        assert previous.df.filter(pl.col('x_lambert93') == 102980).height == 1
+        assert data["previous_version"] == "test-version"
+        assert data["version"] != data["previous_version"]
+        assert (data["added"], data["removed"], data["modified"]) == (1, 1, 0)
+        assert data["towers_count"] == 6
+        assert data["duration_ms"] >= 0
+        assert app.state.dataset.tiles.version == data["version"]
+        assert app.state.dataset.version == data["version"]
+        assert app.state.dataset.index.antennas.filter(pl.col('x_lambert93') == 102980.0).height == 0
+
+    def test_apply_invalid_delta(self, loaded_state):
+        """Test that a delta removing an unknown antenna leaves the dataset as is"""
+        delta = "action,Operateur,x,y,2G,3G,4G\nremove,Orange,1,2,,,\n"
+        response = client.post("/antennas/delta", files={"file": ("delta.csv", delta, "text/csv")})
+
+        assert response.status_code == 400
+        assert app.state.dataset.version == "test-version"
+
+class TestRadiusPresets:
+    """Tests for per-request radii and named radius presets"""
+
+    def test_coverage_with_radius_override(self, test_coverage_data):
+        """Test that a smaller 2G radius drops the coverage of a far site"""
+        point = {"p": {"x": 102980.0, "y": 6830000.0}}
+
+        default = client.post("/coverage", json=point).json()
+        assert default["p"]["orange"]["2G"]
+
+        response = client.post("/coverage?radius_2g=1000", json=point)
+        assert response.status_code == 200
+        assert not response.json()["p"]["orange"]["2G"]
+        assert response.json()["p"]["orange"]["3G"] == default["p"]["orange"]["3G"]
+
+    def test_coverage_with_saved_preset(self, test_coverage_data, monkeypatch):
+        """Test that a saved preset is listed and applied by name"""
+        monkeypatch.setattr("main.radius_presets", RadiusPresets())
+        response = client.put("/radius-presets/strict", json={"2G": 1000, "3G": 1000, "4G": 1000})
+        assert response.status_code == 200
+        assert client.get("/radius-presets").json()["strict"] == {"2G": 1000.0, "3G": 1000.0, "4G": 1000.0}
+
+        response = client.post("/coverage?preset=strict", json={"p": {"x": 102980.0, "y": 6830000.0}})
+        assert not response.json()["p"]["orange"]["2G"]
+
+    def test_unknown_preset(self, test_coverage_data):
+        """Test that an unknown preset is rejected"""
+        response = client.post("/coverage?preset=unknown", json={"p": {"x": 100000.0, "y": 6800000.0}})
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("radius", ["0", "-5", "inf", "nan", "1e300", "100001"])
+    def test_invalid_radius(self, test_coverage_data, radius):
+        """Test that a non-positive, infinite or too large radius is rejected"""
+        point = {"x": 100000.0, "y": 6800000.0}
+        assert client.post(f"/coverage?radius_4g={radius}", json={"p": point}).status_code == 422
+        assert client.post(f"/coverage/points?radius_2g={radius}", json={"x": [point["x"]], "y": [point["y"]]}).status_code == 422
+
+    @pytest.mark.parametrize("radius", [0, 100001, 1e300])
+    def test_invalid_radius_preset(self, test_coverage_data, monkeypatch, radius):
+        """Test that a preset with an out of range radius is not saved"""
+        monkeypatch.setattr("main.radius_presets", RadiusPresets())
+        response = client.put("/radius-presets/wide", json={"2G": radius, "3G": 1000, "4G": 1000})
+        assert response.status_code == 422
+        assert "wide" not in client.get("/radius-presets").json()
+
+    def test_route_with_radius_override(self, test_coverage_data):
+        """Test that route coverage uses the request radii"""
+        response = client.post("/coverage/route?radius_2g=20", json={
+            "points": [{"x": 102990.0, "y": 6847973.0}, {"x": 103990.0, "y": 6847973.0}]
+        })
+        assert response.json()["coverage"]["Orange"]["2G"] == [
+            {"start": 0.0, "end": 100.0, "covered": True},
+            {"start": 100.0, "end": 1000.0, "covered": False},
+        ]
+
+class TestStartup:
+    """Tests for the background startup and the probes"""
+
+    @pytest.fixture
+    def empty_state(self):
+        """Empty application state, restored afterwards"""
+        names = ["startup", "dataset"]
+        saved = {name: getattr(app.state, name, None) for name in names}
+        for name in names:
+            setattr(app.state, name, None)
+        yield
+        for name, value in saved.items():
+            setattr(app.state, name, value)
+
+    def test_liveness(self):
+        """Test that the liveness probe always answers"""
+        response = client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_not_ready_while_loading(self, empty_state):
+        """Test that probes and queries report the data as loading"""
+        app.state.startup = StartupProgress()
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert not response.json()["ready"]
+        assert client.get("/health").json()["status"] == "unhealthy"
+
+        response = client.post("/coverage", json={"p": {"x": 100000.0, "y": 6800000.0}})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_background_loading(self, empty_state):
+        """Test that every phase runs and the application becomes ready"""
+        app.state.startup = StartupProgress()
+        await load_coverage_data(app, TEST_CSV_PATH, app.state.startup)
+
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        phases = response.json()["phases"]
+        assert set(phases) == {"load_csv", "imports", "projection", "spatial_index", "antenna_tiles", "warmup"}
+        assert all(phase["status"] == "done" for phase in phases.values())
+        assert app.state.dataset.df.height == 6
+
+    @pytest.mark.asyncio
+    async def test_background_loading_missing_csv(self, empty_state):
+        """Test that a missing CSV fails readiness and queries get a 500"""
+        app.state.startup = StartupProgress()
+        await load_coverage_data(app, Path("missing.csv"), app.state.startup)
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["phases"]["load_csv"]["status"] == "failed"
+        assert client.post("/coverage", json={"p": {"x": 100000.0, "y": 6800000.0}}).status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_background_loading_error_between_phases(self, empty_state):
+        """Test that an error raised outside of a phase fails readiness"""
+        app.state.startup = StartupProgress()
+        with patch('main.compute_dataset_version', side_effect=ValueError("boom")):
+            await load_coverage_data(app, TEST_CSV_PATH, app.state.startup)
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert "boom" in response.json()["error"]
+        assert app.state.dataset is None
+
 class TestHelperFunctions:
     """Tests for helper functions"""
     
@@ -70,4 +70,18 @@ describe('CoverageService', () => {
     // Simulate server error response
     req.flush(errorMessage, { status: 500, statusText: errorMessage });
   });
+
+  it('should send a GET request for an antenna tile', (done: DoneFn) => {
+    const mockTile = { z: 12, x: 2074, y: 1409, clustered: false, antennas: [], clusters: [] };
+
+    service.getAntennaTile(12, 2074, 1409).subscribe(response => {
+      expect(response).toEqual(mockTile);
+      done();
+    });
+
+    const req = httpMock.expectOne(`${apiUrl}/antennas/tiles/12/2074/1409`);
+    expect(req.request.method).toBe('GET');
+
+    req.flush(mockTile);
+  });
 });
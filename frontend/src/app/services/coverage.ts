@@ -18,4 +18,10 @@ export class CoverageService {
 
     return this.http.post(`${this.apiUrl}/coverage`, payload);
   }
+
+  // This method gets the antennas of a map tile (clustered when the tile is dense)
+  // The browser cache revalidates tiles with their ETag
+  getAntennaTile(z: number, x: number, y: number): Observable<any> {
+    return this.http.get(`${this.apiUrl}/antennas/tiles/${z}/${x}/${y}`);
+  }
 }